@@ -2,30 +2,46 @@
 
 import asyncio
 import logging
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Form
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Form, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, HTMLResponse
 import os
 from typing import Optional
-from src import get_question_generator
+from src import get_question_generator, GeneratorPool
 from src import (
     IngestPDFResponse,
+    IngestJobResponse,
+    JobStatusResponse,
     GenerateLevel1Response,
     GenerateLevel2Response,
     ChatResponse,
-    ResetDataResponse
+    ResetDataResponse,
+    DeleteCollectionResponse,
+    CompactResponse
 )
-from src import AdvanceQuestionGeneratorClass
+from src import AdvanceQuestionGeneratorClass, IngestionJobManager, LLMResponseCache, query_embedding_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Generators are shared across requests instead of being rebuilt for each one
+    app.state.generator_pool = GeneratorPool(
+        max_size=int(os.getenv("GENERATOR_POOL_SIZE", 16)),
+        idle_seconds=float(os.getenv("GENERATOR_POOL_IDLE_SECONDS", 1800)),
+    )
+    yield
+    app.state.generator_pool.clear()
+
 app = FastAPI(
     title="Advanced Question Generator API",
     description="API for generating Level 1 & 2 questions and performing chat operations using Gemini and RAG.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -34,6 +50,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],)
+
+# Background ingestion jobs outlive the request that submitted them
+ingestion_jobs = IngestionJobManager()
 # Wrapper class to map 'filename' to 'name' and provide a synchronous 'read' method
 
 app.mount("/static", StaticFiles(directory="src/static"), name="static")
@@ -58,14 +77,24 @@ class UploadFileWrapper:
         self.file = upload_file.file
         self.content_type = upload_file.content_type
 
-    def read(self):
+    def seek(self, offset: int = 0):
+        """
+        Synchronously move the cursor of the underlying spooled file.
+        """
+        return self.file.seek(offset)
+
+    def read(self, size: int = -1):
         """
-        Synchronously read the entire content of the uploaded file.
+        Synchronously read the uploaded file.
+
+        With the default size the entire content is read from the beginning;
+        a positive size reads the next chunk, so callers can stream the upload.
         """
         try:
-            # Move the cursor to the beginning of the file to ensure full read
-            self.file.seek(0)
-            return self.file.read()
+            if size < 0:
+                # Move the cursor to the beginning of the file to ensure full read
+                self.file.seek(0)
+            return self.file.read(size)
         except Exception as e:
             logger.error(f"Error reading file content: {e}")
             raise
@@ -98,6 +127,49 @@ async def ingest_pdf(
         logger.exception(f"Unexpected error during PDF ingestion: {e}")
         raise HTTPException(status_code=500, detail="An error occurred while ingesting the PDF.")
 
+@app.post("/jobs/ingest_pdf", response_model=IngestJobResponse)
+async def submit_ingest_pdf_job(
+    pdf_file: UploadFile = File(...),
+    generator: AdvanceQuestionGeneratorClass = Depends(get_question_generator)
+):
+    """
+    Queues a PDF for background ingestion and returns a job ID immediately.
+    """
+    if not pdf_file.filename.lower().endswith('.pdf'):
+        logger.error(f"Unsupported file type: {pdf_file.filename}")
+        raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+
+    try:
+        logger.info(f"Received PDF file for background ingestion: {pdf_file.filename}")
+
+        # The upload is closed once the request ends, so spool it to disk before queueing
+        wrapped_pdf = UploadFileWrapper(pdf_file)
+        pdf_path, content_hash = await asyncio.to_thread(generator.pdf.spool_to_file, wrapped_pdf)
+
+        try:
+            job = ingestion_jobs.submit(generator, pdf_path, content_hash, pdf_file.filename)
+        except Exception:
+            # The job manager only owns the spooled file once submit returns
+            if os.path.exists(pdf_path):
+                os.remove(pdf_path)
+            raise
+        logger.info(f"Ingestion job {job.job_id} queued for {pdf_file.filename}")
+        return IngestJobResponse(job_id=job.job_id, status=job.status)
+    except Exception as e:
+        logger.exception(f"Unexpected error while queueing PDF ingestion: {e}")
+        raise HTTPException(status_code=500, detail="An error occurred while queueing the PDF for ingestion.")
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """
+    Reports the progress, completion or error of a background ingestion job.
+    """
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        logger.error(f"Unknown ingestion job: {job_id}")
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return JobStatusResponse(**job.to_dict())
+
 @app.post("/generate_level_1", response_model=GenerateLevel1Response)
 async def generate_level_1(
     collection_name: str = Form(...),
@@ -179,6 +251,7 @@ async def chat(
 
 @app.post("/reset_data", response_model=ResetDataResponse)
 async def reset_data(
+    request: Request,
     generator: AdvanceQuestionGeneratorClass = Depends(get_question_generator)
 ):
     """
@@ -187,6 +260,8 @@ async def reset_data(
     try:
         logger.info("Resetting all ingested data and clearing the vector store.")
         await generator.reset_data()
+        # Other pooled generators still hold caches of the wiped store
+        request.app.state.generator_pool.clear()
         logger.info("Data reset successfully.")
         return ResetDataResponse(status="Data reset successfully")
     except Exception as e:
@@ -194,3 +269,59 @@ async def reset_data(
         raise HTTPException(status_code=500, detail="An error occurred while resetting the data.")
     
 
+@app.delete("/collections/{collection_name}", response_model=DeleteCollectionResponse)
+async def delete_collection(
+    collection_name: str,
+    request: Request,
+    generator: AdvanceQuestionGeneratorClass = Depends(get_question_generator)
+):
+    """
+    Deletes one ingested PDF's collection without touching the others.
+    """
+    try:
+        logger.info(f"Deleting collection '{collection_name}'.")
+        await generator.delete_collection(collection_name)
+        # Other pooled generators may still cache this collection
+        request.app.state.generator_pool.forget_collection(collection_name)
+        logger.info(f"Collection '{collection_name}' deleted successfully.")
+        return DeleteCollectionResponse(collection_name=collection_name, status="deleted")
+    except ValueError as ve:
+        logger.error(f"Collection not found: {ve}")
+        raise HTTPException(status_code=404, detail=str(ve))
+    except Exception as e:
+        logger.exception(f"Unexpected error during collection deletion: {e}")
+        raise HTTPException(status_code=500, detail="An error occurred while deleting the collection.")
+
+@app.post("/collections/compact", response_model=CompactResponse)
+async def compact_collections(
+    generator: AdvanceQuestionGeneratorClass = Depends(get_question_generator)
+):
+    """
+    Reclaims the disk space left by deleted collections.
+    """
+    try:
+        logger.info("Compacting the vector store.")
+        stats = await generator.compact_storage()
+        logger.info(f"Vector store compacted: {stats}")
+        return CompactResponse(
+            bytes_before=stats["bytes_before"],
+            bytes_after=stats["bytes_after"],
+            reclaimed_bytes=stats["bytes_before"] - stats["bytes_after"],
+        )
+    except Exception as e:
+        logger.exception(f"Unexpected error during compaction: {e}")
+        raise HTTPException(status_code=500, detail="An error occurred while compacting the vector store.")
+
+@app.get("/metrics/llm_cache")
+async def llm_cache_metrics():
+    """
+    Returns the LLM response cache size and the hit rate of every call site.
+    """
+    return await asyncio.to_thread(LLMResponseCache.shared().stats)
+
+@app.get("/metrics/query_cache")
+async def query_cache_metrics():
+    """
+    Returns the size and hit rate of the in-memory query embedding cache.
+    """
+    return query_embedding_cache.stats()
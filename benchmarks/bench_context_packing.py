@@ -0,0 +1,66 @@
+"""
+Benchmark: prompt context size and source coverage of raw top-k retrieval versus MMR
+context packing, on a collection where every page is stored twice (as a summary page
+and its chapter would overlap).
+
+For each sampled query it reports the context tokens, the number of distinct source
+pages among the picked chunks, and the time spent selecting.
+
+Usage:
+    python benchmarks/bench_context_packing.py ["data/Project Management.pdf"] [k] [token_budget]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.pdf_to_text import PDFtoText
+from src.modules.RAG_implementation import create_vector_store
+from src.modules.context_packer import ContextPacker
+from src.modules.text_chunker import TextChunker
+
+from bench_retrieval_modes import sample_queries
+
+DEFAULT_PDF = os.path.join("data", "Project Management.pdf")
+
+
+def summarize(documents_per_query):
+    tokens = sum(TextChunker.count_tokens(doc["document"]) for docs in documents_per_query for doc in docs)
+    pages = sum(
+        len({str(doc["metadata"]["page_number"]).replace("_copy", "") for doc in docs})
+        for docs in documents_per_query
+    )
+    return tokens / len(documents_per_query), pages / len(documents_per_query)
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PDF
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    token_budget = int(sys.argv[3]) if len(sys.argv) > 3 else 768
+    pages, _ = PDFtoText().extract_pages_and_text(pdf_path)
+    _, keywords = sample_queries(pages)
+    queries = [query for _, query in keywords]
+    duplicated = dict(pages)
+    duplicated.update({f"{page_number}_copy": text for page_number, text in pages.items()})
+
+    packer = ContextPacker(token_budget=token_budget)
+    with tempfile.TemporaryDirectory() as directory:
+        # Without the shared embedding cache, which would outlive the temporary directory
+        store = create_vector_store("numpy", openai_api_key=None, persist_directory=directory, use_embedding_cache=False)
+        store.store_texts(duplicated, collection_name="benchmark")
+        store.get_query_embeddings(queries)  # Both variants then hit the query cache
+
+        start = time.perf_counter()
+        raw = [docs for _, docs in store.fetch_relevant_documents_batch(queries, "benchmark", top_k=k)]
+        raw_time = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        packed = [docs for _, docs in store.fetch_packed_documents_batch(queries, "benchmark", packer, top_k=k)]
+        packed_time = (time.perf_counter() - start) / len(queries)
+
+    print(f"pages={len(pages)} (stored twice) queries={len(queries)} k={k} token_budget={token_budget}")
+    for label, documents, elapsed in (("top-k", raw, raw_time), ("mmr-packed", packed, packed_time)):
+        tokens, distinct = summarize(documents)
+        print(f"{label:11s} {tokens:7.1f} tokens/query  {distinct:4.2f} distinct pages/query  {elapsed * 1000:7.3f} ms/query")
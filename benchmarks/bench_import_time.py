@@ -0,0 +1,56 @@
+"""
+Benchmark: cold-start import time of the FastAPI service, from `python -X importtime`.
+
+Prints the slowest top-level imports and fails (exit code 1) when importing the
+service exceeds the budget, so heavy dependencies creeping back into module load
+are caught.
+
+Usage:
+    python benchmarks/bench_import_time.py [--module app] [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+def import_times(module):
+    """
+    Returns (module, self_us, cumulative_us, depth) tuples for a fresh interpreter importing module.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 1500)))
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    total_ms = next(cumulative for name, _, cumulative, _ in reversed(rows) if name == args.module) / 1000
+
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    top_level = [row for row in rows if row[3] <= 1]
+    for name, self_us, cumulative_us, _ in sorted(top_level, key=lambda row: -row[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {name}")
+
+    print(f"\nimport {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if total_ms > args.budget_ms:
+        print("Over budget")
+        sys.exit(1)
@@ -0,0 +1,46 @@
+"""
+Benchmark: per-text vs batched local SentenceTransformer embedding of PDF chunks,
+reported in pages/sec and chunks/sec.
+
+Usage:
+    python benchmarks/bench_local_embedding.py ["data/Project Management.pdf"]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.pdf_to_text import PDFtoText
+from src.modules.RAG_implementation import ChromaVectorStore
+
+DEFAULT_PDF = os.path.join("data", "Project Management.pdf")
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PDF
+    pages, _ = PDFtoText().extract_pages_and_text(pdf_path)
+
+    with tempfile.TemporaryDirectory() as persist_directory:
+        # Without the embedding cache, so every run times the model, not cache hits
+        store = ChromaVectorStore(openai_api_key=None, persist_directory=persist_directory, use_embedding_cache=False)
+        texts = [
+            chunk["text"]
+            for page_num, text in pages.items()
+            for chunk in store.chunker.chunk_page(page_num, text)
+        ]
+        store.get_document_embeddings(texts[:8])  # Warm up the model
+
+        start = time.perf_counter()
+        for text in texts:
+            store.get_embedding(text)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.get_document_embeddings(texts)
+        batched = time.perf_counter() - start
+
+    print(f"pages={len(pages)} chunks={len(texts)} batch_size={store.embedding_batch_size}")
+    print(f"per-text  {len(pages) / single:8.1f} pages/sec {len(texts) / single:8.1f} chunks/sec")
+    print(f"batched   {len(pages) / batched:8.1f} pages/sec {len(texts) / batched:8.1f} chunks/sec")
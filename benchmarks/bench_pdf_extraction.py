@@ -0,0 +1,53 @@
+"""
+Benchmark: two-pass vs single-pass (serial and parallel) PDF extraction used by
+`ingest_input_pdf`.
+
+Each mode runs in its own subprocess so the peak RSS reported is not polluted
+by the other mode.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py ["data/Project Management.pdf"]
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_PDF = os.path.join("data", "Project Management.pdf")
+
+
+def run_mode(mode, pdf_path):
+    from io import BytesIO
+    from src.modules.pdf_to_text import PDFtoText
+
+    pdf = PDFtoText()
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+
+    start = time.perf_counter()
+    if mode == "two_pass":
+        pages = pdf.extract_all_text_page_wise(BytesIO(pdf_bytes))
+        all_text = pdf.extract_all_text(BytesIO(pdf_bytes))
+    elif mode == "single_pass":
+        pdf.workers = 1
+        pages, all_text = pdf.extract_pages_and_text(pdf_bytes)
+    else:
+        pdf.parallel_min_pages = 0
+        pages, all_text = pdf.extract_pages_and_text(pdf_bytes)
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode:<12} pages={len(pages):<5} chars={len(all_text):<9} time={elapsed:.3f}s peak_rss={peak_kb / 1024:.1f}MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PDF
+    for mode in ("two_pass", "single_pass", "parallel"):
+        subprocess.run([sys.executable, __file__, "--mode", mode, pdf_path], check=True)
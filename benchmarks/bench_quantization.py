@@ -0,0 +1,88 @@
+"""
+Benchmark: disk size, query latency and recall@k of reduced-precision NumPy vector store
+collections against float32, on a held-out query set drawn from the same PDF.
+
+The query set is one sentence sampled per page (seeded), embedded as a query, so it
+does not match any stored chunk exactly. recall@k is the share of the float32 top-k
+that each mode also returns in its top-k.
+
+Usage:
+    python benchmarks/bench_quantization.py ["data/Project Management.pdf"] [k]
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.pdf_to_text import PDFtoText
+from src.modules.numpy_vector_store import NumpyVectorStore
+from src.modules.embedding_cache import EmbeddingCache
+
+DEFAULT_PDF = os.path.join("data", "Project Management.pdf")
+MODES = [
+    ("float32", 0),
+    ("float16", 0),
+    ("float16", 4),
+    ("int8", 0),
+    ("int8", 4),
+]
+
+
+def held_out_queries(pages, seed=0):
+    rng = random.Random(seed)
+    queries = []
+    for text in pages.values():
+        sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if len(s.split()) >= 5]
+        if sentences:
+            queries.append(rng.choice(sentences))
+    return queries
+
+
+def disk_bytes(directory):
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(directory)
+        if name.startswith(("embeddings.", "scales."))
+    )
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PDF
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    pages, _ = PDFtoText().extract_pages_and_text(pdf_path)
+    queries = held_out_queries(pages)
+
+    with tempfile.TemporaryDirectory() as directory:
+        embedding_cache = EmbeddingCache(os.path.join(directory, "embedding_cache"))
+        results = {}
+        for precision, rescore_factor in MODES:
+            store = NumpyVectorStore(
+                openai_api_key=None,
+                persist_directory=os.path.join(directory, f"{precision}_{rescore_factor}"),
+                embedding_cache=embedding_cache,
+                precision=precision,
+                rescore_factor=rescore_factor,
+            )
+            store.store_texts(pages, collection_name="benchmark")
+            query_embeddings = store.get_query_embeddings(queries)
+
+            start = time.perf_counter()
+            ranked = store._query("benchmark", query_embeddings, k)["ids"]
+            elapsed = (time.perf_counter() - start) / len(queries)
+            size = disk_bytes(store._collection_dir("benchmark"))
+            results[(precision, rescore_factor)] = (ranked, elapsed, size)
+
+    reference = results[("float32", 0)][0]
+    print(f"pages={len(pages)} queries={len(queries)} k={k}")
+    for (precision, rescore_factor), (ranked, elapsed, size) in results.items():
+        hits = sum(len(set(r) & set(e)) for r, e in zip(ranked, reference))
+        recall = hits / sum(len(e) for e in reference)
+        label = f"{precision}" + (f" + rescore x{rescore_factor}" if rescore_factor else "")
+        print(
+            f"{label:20s} matrix {size / 1024:8.1f} KiB  query {elapsed * 1000:7.3f} ms  "
+            f"recall@{k} {recall:.4f}"
+        )
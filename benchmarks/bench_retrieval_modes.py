@@ -0,0 +1,75 @@
+"""
+Benchmark: latency and recall of the vector, lexical (BM25) and hybrid retrieval modes on
+the same PDF.
+
+Queries are sampled from the pages (seeded): one full sentence per page, and a
+keyword-style topic made of three of that sentence's words. A query counts as a hit when
+a chunk of its source page is in the top k. Latency includes embedding the query, with
+the query-embedding cache cleared, since that is the cost lexical retrieval avoids.
+
+Usage:
+    python benchmarks/bench_retrieval_modes.py ["data/Project Management.pdf"] [k] [chroma|numpy]
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.pdf_to_text import PDFtoText
+from src.modules.RAG_implementation import create_vector_store
+from src.modules.lexical_index import LexicalIndex
+from src.modules.vector_store_base import RETRIEVAL_MODES
+
+DEFAULT_PDF = os.path.join("data", "Project Management.pdf")
+
+
+def sample_queries(pages, seed=0):
+    rng = random.Random(seed)
+    sentences, keywords = [], []
+    for page_number, text in pages.items():
+        candidates = [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if len(LexicalIndex.tokenize(s)) >= 5]
+        if not candidates:
+            continue
+        sentence = rng.choice(candidates)
+        sentences.append((page_number, sentence))
+        keywords.append((page_number, " ".join(rng.sample(LexicalIndex.tokenize(sentence), 3))))
+    return sentences, keywords
+
+
+def evaluate(store, queries, k, mode):
+    hits = 0
+    start = time.perf_counter()
+    for page_number, query in queries:
+        _, documents = store.fetch_relevant_documents(query, "benchmark", top_k=k, mode=mode)
+        hits += any(str(doc["metadata"]["page_number"]) == str(page_number) for doc in documents)
+    elapsed = (time.perf_counter() - start) / len(queries)
+    return hits / len(queries), elapsed
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PDF
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    backend = sys.argv[3] if len(sys.argv) > 3 else "chroma"
+    pages, _ = PDFtoText().extract_pages_and_text(pdf_path)
+    sentences, keywords = sample_queries(pages)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Without the shared embedding cache, which would outlive the temporary directory
+        store = create_vector_store(backend, openai_api_key=None, persist_directory=directory, use_embedding_cache=False)
+        store.store_texts(pages, collection_name="benchmark")
+
+        rows = []
+        for label, queries in (("sentence", sentences), ("keywords", keywords)):
+            for mode in RETRIEVAL_MODES:
+                store.query_cache.clear()
+                recall, elapsed = evaluate(store, queries, k, mode)
+                rows.append((label, mode, recall, elapsed))
+        store.reset_client()
+
+    print(f"backend={backend} pages={len(pages)} queries={len(sentences)} k={k}")
+    for label, mode, recall, elapsed in rows:
+        print(f"{label:9s} {mode:8s} recall@{k} {recall:.3f}  latency {elapsed * 1000:7.3f} ms/query")
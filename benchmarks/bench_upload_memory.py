@@ -0,0 +1,53 @@
+"""
+Benchmark: peak RSS of the in-memory upload path vs the disk-spooled path used by
+`ingest_input_pdf`.
+
+Each mode runs in its own subprocess. Use a large PDF to see the difference.
+
+Usage:
+    python benchmarks/bench_upload_memory.py path/to/large.pdf
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_PDF = os.path.join("data", "Project Management.pdf")
+
+
+def run_mode(mode, pdf_path):
+    from io import BytesIO
+    from src.modules.pdf_to_text import PDFtoText
+
+    pdf = PDFtoText(workers=1)
+    start = time.perf_counter()
+    with open(pdf_path, "rb") as upload:
+        if mode == "in_memory":
+            # Mirrors the previous ingest path: full read plus BytesIO copies
+            pdf_bytes = upload.read()
+            pages = pdf.extract_all_text_page_wise(BytesIO(pdf_bytes))
+            all_text = pdf.extract_all_text(BytesIO(pdf_bytes))
+        else:
+            path, _ = pdf.spool_to_file(upload)
+            try:
+                pages, all_text = pdf.extract_pages_and_text(path)
+            finally:
+                os.remove(path)
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode:<10} pages={len(pages):<5} time={elapsed:.3f}s peak_rss={peak_kb / 1024:.1f}MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PDF
+    print(f"file size={os.path.getsize(pdf_path) / (1024 * 1024):.1f}MB")
+    for mode in ("in_memory", "spooled"):
+        subprocess.run([sys.executable, __file__, "--mode", mode, pdf_path], check=True)
@@ -0,0 +1,92 @@
+"""
+Benchmark: query latency and memory of the Chroma and NumPy vector store backends on
+the same PDF, with identical chunks and embeddings.
+
+Embeddings are computed once with the local model and reused through the embedding
+cache, so the timings only cover storing and querying. Memory is the increase of the
+process's resident set size (Linux) once each backend has ingested and answered the
+queries, with the store still alive.
+
+Usage:
+    python benchmarks/bench_vector_stores.py ["data/Project Management.pdf"] [queries]
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.pdf_to_text import PDFtoText
+from src.modules.RAG_implementation import create_vector_store
+from src.modules.embedding_cache import EmbeddingCache
+
+DEFAULT_PDF = os.path.join("data", "Project Management.pdf")
+TOPICS = [
+    "project scope", "risk management", "stakeholders", "project schedule",
+    "budget and cost control", "quality assurance", "team roles", "project closure",
+]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * resource.getpagesize() / (1024 * 1024)
+
+
+def run(backend, pages, embedding_cache, persist_directory, queries):
+    rss_before = rss_mb()
+    store = create_vector_store(
+        backend, openai_api_key=None, persist_directory=persist_directory,
+        embedding_cache=embedding_cache,
+    )
+    start = time.perf_counter()
+    store.store_texts(pages, collection_name="benchmark")
+    ingest = time.perf_counter() - start
+
+    query_embeddings = store.get_query_embeddings(TOPICS)
+    store._query("benchmark", query_embeddings[:1], 5)  # Warm up
+
+    start = time.perf_counter()
+    for i in range(queries):
+        store._query("benchmark", [query_embeddings[i % len(TOPICS)]], 5)
+    single = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for _ in range(queries // len(TOPICS) or 1):
+        store._query("benchmark", query_embeddings, 5)
+    batched = (time.perf_counter() - start) / ((queries // len(TOPICS) or 1) * len(TOPICS))
+
+    rss = rss_mb() - rss_before
+    store.reset_client()
+    return ingest, single, batched, rss
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PDF
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    pages, _ = PDFtoText().extract_pages_and_text(pdf_path)
+
+    with tempfile.TemporaryDirectory() as directory:
+        embedding_cache = EmbeddingCache(os.path.join(directory, "embedding_cache"))
+        # Fill the embedding cache so neither backend pays for the model
+        warmup = create_vector_store(
+            "numpy", openai_api_key=None, persist_directory=os.path.join(directory, "warmup"),
+            embedding_cache=embedding_cache,
+        )
+        warmup.store_texts(pages, collection_name="benchmark")
+        warmup.get_query_embeddings(TOPICS)
+
+        results = {}
+        for backend in ("numpy", "chroma"):
+            results[backend] = run(
+                backend, pages, embedding_cache, os.path.join(directory, backend), queries
+            )
+
+    print(f"pages={len(pages)} queries={queries} top_k=5")
+    for backend, (ingest, single, batched, rss) in results.items():
+        print(
+            f"{backend:7s} ingest {ingest * 1000:8.1f} ms  query {single * 1000:7.3f} ms  "
+            f"batched {batched * 1000:7.3f} ms/topic  RSS +{rss:6.1f} MB"
+        )
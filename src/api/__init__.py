@@ -1,2 +1,3 @@
 from .dependencies import get_openai_key, get_question_generator
-from .schemas import ChatResponse, IngestPDFResponse, GenerateLevel1Response, GenerateLevel2Response, ResetDataResponse
\ No newline at end of file
+from .generator_pool import GeneratorPool
+from .schemas import ChatResponse, IngestPDFResponse, IngestJobResponse, JobStatusResponse, GenerateLevel1Response, GenerateLevel2Response, ResetDataResponse, DeleteCollectionResponse, CompactResponse
\ No newline at end of file
@@ -1,5 +1,5 @@
 # app/dependencies.py
-from fastapi import Header, HTTPException, Depends
+from fastapi import Header, HTTPException, Depends, Request
 from typing import Optional
 from src  import AdvanceQuestionGeneratorClass
 
@@ -8,6 +8,8 @@ async def get_openai_key(x_api_key: Optional[str] = Header(None)):
         raise HTTPException(status_code=400, detail="Missing  API Key in headers.")
     return x_api_key
 
-async def get_question_generator(openai_key: str = Depends(get_openai_key)):
-    generator = AdvanceQuestionGeneratorClass(openai_key=openai_key)
-    return generator
+async def get_question_generator(request: Request, openai_key: str = Depends(get_openai_key)):
+    pool = getattr(request.app.state, "generator_pool", None)
+    if pool is None:
+        return AdvanceQuestionGeneratorClass(openai_key=openai_key)
+    return await pool.get(openai_key)
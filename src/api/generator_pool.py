@@ -0,0 +1,90 @@
+# app/generator_pool.py
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+from src.modules import AdvanceQuestionGeneratorClass
+
+
+class GeneratorPool:
+    """
+    Application-scoped pool of AdvanceQuestionGeneratorClass instances.
+
+    Generators are keyed by (API key, model name, temperature) and reused across requests,
+    so the LLM client, prompts, Chroma client, embedding model and the per-instance
+    caches survive between requests. Idle generators are evicted after idle_seconds and
+    the least recently used ones beyond max_size.
+
+    The pool's lock only guards lookups and inserts. A generator is constructed outside
+    it, once per key, so requests for other configurations are not held up by it.
+    """
+
+    def __init__(self, max_size: int = 16, idle_seconds: float = 1800):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._generators = OrderedDict()  # key -> (generator, last_used)
+        self._pending = {}  # key -> task constructing the generator
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _key(openai_key: str, model_name: Optional[str], temperature: float) -> tuple:
+        # Keep raw API keys out of the pool's keys
+        return hashlib.sha256(openai_key.encode("utf-8")).hexdigest(), model_name, temperature
+
+    async def get(self, openai_key: str, model_name: Optional[str] = None, temperature: float = 0.7) -> AdvanceQuestionGeneratorClass:
+        """
+        Returns the pooled generator for the configuration, creating it on first use.
+        """
+        key = self._key(openai_key, model_name, temperature)
+        async with self._lock:
+            now = time.monotonic()
+            self._evict(now)
+            if key in self._generators:
+                generator, _ = self._generators.pop(key)
+                self._generators[key] = (generator, now)
+                return generator
+            task = self._pending.get(key)
+            if task is None:
+                # Construction loads prompts, clients and possibly a local model; keep it off the event loop
+                task = asyncio.ensure_future(asyncio.to_thread(
+                    AdvanceQuestionGeneratorClass,
+                    openai_key=openai_key, model_name=model_name, temperature=temperature
+                ))
+                self._pending[key] = task
+
+        # Concurrent requests for the same key wait for the same construction
+        try:
+            generator = await asyncio.shield(task)
+        finally:
+            async with self._lock:
+                if task.done() and self._pending.get(key) is task:
+                    del self._pending[key]
+                    if not task.cancelled() and task.exception() is None:
+                        self._generators[key] = (task.result(), time.monotonic())
+                        while len(self._generators) > self.max_size:
+                            self._generators.popitem(last=False)
+        return generator
+
+    def _evict(self, now: float) -> None:
+        for key in [key for key, (_, last_used) in self._generators.items() if now - last_used > self.idle_seconds]:
+            del self._generators[key]
+
+    def forget_collection(self, collection_name: str) -> None:
+        """
+        Drops a deleted collection from the caches of every pooled generator; their other
+        collections stay warm.
+        """
+        for generator, _ in list(self._generators.values()):
+            generator.forget_collection(collection_name)
+
+    def clear(self) -> None:
+        """
+        Drops every pooled generator, e.g. after the shared vector store has been reset.
+        Generators still being constructed are handed to their requests but not pooled.
+        """
+        self._generators.clear()
+        self._pending.clear()
+
+    def __len__(self) -> int:
+        return len(self._generators)
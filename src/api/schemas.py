@@ -6,6 +6,21 @@ class IngestPDFResponse(BaseModel):
     collection_name: str
     status: str
 
+class IngestJobResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    file_name: str
+    status: str
+    collection_name: Optional[str] = None
+    pages_processed: int
+    total_pages: int
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
 class GenerateLevel1Response(BaseModel):
     metadata: dict
     questions: List[dict]
@@ -22,3 +37,12 @@ class ChatResponse(BaseModel):
 
 class ResetDataResponse(BaseModel):
     status: str
+
+class DeleteCollectionResponse(BaseModel):
+    collection_name: str
+    status: str
+
+class CompactResponse(BaseModel):
+    bytes_before: int
+    bytes_after: int
+    reclaimed_bytes: int
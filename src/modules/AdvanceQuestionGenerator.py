@@ -1,61 +1,101 @@
 import asyncio
-from io import BytesIO
+import os
+from contextlib import asynccontextmanager
 from .OpenAiRunner import OpenAiRunnerClass
-from .RAG_implementation import ChromaVectorStore
+from .RAG_implementation import create_vector_store
 from .pdf_to_text import PDFtoText
+from .ingestion_registry import IngestionRegistry
+from .collection_tiers import CollectionTierManager
+from .context_packer import ContextPacker
 from src.constants import MetadataRAG
 import re
 
 class AdvanceQuestionGeneratorClass:
-    def __init__(self, openai_key=None, model_name=None, temperature=0.7) -> None:
+    def __init__(self, openai_key=None, model_name=None, temperature=0.7, vector_store=None) -> None:
         self.openai = OpenAiRunnerClass(
             model_name=model_name,
             openai_key=openai_key,
             temperature=temperature
         )
-        self.RAG = ChromaVectorStore(
+        # 'chroma' (default) or 'numpy', see create_vector_store
+        self.RAG = create_vector_store(
+            vector_store or os.getenv("VECTOR_STORE_BACKEND", "chroma"),
             openai_api_key= openai_key)
         self.pdf = PDFtoText()
-        self.ingested_pdfs = []  # List to keep track of ingested PDFs
+        # 'vector', 'lexical' or 'hybrid'; lexical topic retrieval needs no embedding call
+        self.topic_retrieval_mode = os.getenv("TOPIC_RETRIEVAL_MODE", "vector")
+        self.chat_retrieval_mode = os.getenv("CHAT_RETRIEVAL_MODE", "vector")
+        # Picks diverse chunks within a token budget instead of the raw top_k
+        self.context_packer = ContextPacker()
+        # Persistent content hash -> collection map, shared by every generator on this store
+        self.registry = IngestionRegistry.shared(self.RAG.persist_directory)
+        self.ingested_pdfs = []  # Content hashes of PDFs ingested by this instance
         self.collection_texts = {}  # Dict to map collection_name to extracted text
+        # Shared by every generator on this store: hot, warm (on disk) and archived collections
+        self.tiers = CollectionTierManager.shared(
+            os.path.join(os.path.dirname(os.path.abspath(self.RAG.persist_directory)), "collection_archive")
+        )
+        self.tiers.subscribe(self._evict_collection)
 
-    async def ingest_input_pdf(self, pdf_file):
+    async def ingest_input_pdf(self, pdf_file, progress_callback=None):
         """
         Ingests the input PDF file and processes it to extract text and store embeddings.
 
         Args:
             pdf_file: The uploaded PDF file object.
+            progress_callback: Optional callable receiving (pages_processed, total_pages).
 
         Returns:
             str: Name of the collection created for the PDF.
         """
-        # Process PDF name
-        collection_name = await self._process_input_pdf(pdf_file.name)
-
-        if pdf_file.name in self.ingested_pdfs:
-            print(f"{pdf_file.name} is already ingested.")
-            return collection_name
+        # Spool the upload to disk in chunks, hashing it on the way
+        pdf_path, content_hash = await asyncio.to_thread(self.pdf.spool_to_file, pdf_file)
+        return await self.ingest_spooled_pdf(pdf_path, content_hash, pdf_file.name, progress_callback)
 
-        # Read the PDF file content into bytes
-        pdf_bytes = pdf_file.read()
+    async def ingest_spooled_pdf(self, pdf_path, content_hash, file_name, progress_callback=None):
+        """
+        Ingests a PDF that has already been spooled to disk. Takes ownership of pdf_path
+        and removes it once the text has been extracted.
 
-        # Create BytesIO objects for each method call
-        pdf_stream1 = BytesIO(pdf_bytes)
-        pdf_stream2 = BytesIO(pdf_bytes)
+        Args:
+            pdf_path (str): Path of the spooled PDF file.
+            content_hash (str): SHA-256 of the PDF content.
+            file_name (str): Original name of the uploaded file.
+            progress_callback: Optional callable receiving (pages_processed, total_pages).
 
-        # Extract all text and page-wise text from PDF in separate threads
-        all_text_page_wise = await asyncio.to_thread(self.pdf.extract_all_text_page_wise, pdf_stream1)
-        all_text = await asyncio.to_thread(self.pdf.extract_all_text, pdf_stream2)
+        Returns:
+            str: Name of the collection created for the PDF.
+        """
+        try:
+            collection_name = self.registry.get(content_hash)
+            if collection_name and (content_hash in self.ingested_pdfs or await self._use_collection(collection_name)):
+                print(f"{file_name} is already ingested as '{collection_name}'.")
+                return collection_name
+
+            # Process PDF name, disambiguating different books that share a filename
+            collection_name = await self._process_input_pdf(file_name)
+            if await asyncio.to_thread(self._is_collection_taken, collection_name, content_hash):
+                collection_name = f"{collection_name}_{content_hash[:8]}"
+
+            # Extract page-wise text and the full text in a single parse of the spooled file
+            all_text_page_wise, all_text = await asyncio.to_thread(self.pdf.extract_pages_and_text, pdf_path)
+        finally:
+            os.remove(pdf_path)
 
         # Store the extracted text
         self.collection_texts[collection_name] = all_text
 
         # Store texts in RAG vector store in a separate thread
+        # The content hash is stored with the collection, so only a retry of this PDF resumes into it
         await asyncio.to_thread(
-            self.RAG.store_texts, all_text_page_wise, collection_name=collection_name
+            self.RAG.store_texts, all_text_page_wise, collection_name=collection_name,
+            progress_callback=progress_callback, content_hash=content_hash
         )
 
-        self.ingested_pdfs.append(pdf_file.name)
+        self.registry.register(content_hash, collection_name, file_name)
+        self.ingested_pdfs.append(content_hash)
+        if not await self._use_collection(collection_name):
+            raise ValueError(f"Collection '{collection_name}' was deleted during ingestion.")
 
         return collection_name
 
@@ -72,16 +112,16 @@ class AdvanceQuestionGeneratorClass:
         Returns:
             dict: Generated topics and questions.
         """
-        # Retrieve the extracted text
-        all_text = self.collection_texts.get(collection_name) 
-        if not all_text:
-           all_text = self.RAG.get_all_text_str(collection_name)
-           
+        async with self._using_collection(collection_name):
+            # Retrieve the extracted text
+            all_text = self.collection_texts.get(collection_name)
+            if not all_text:
+                all_text = self.RAG.get_all_text_str(collection_name)
 
-        # Generate topics and MCQs using OpenAI
-        res = await self.openai.generate_topics_and_mcqs(context=all_text)
+            # Generate topics and MCQs using OpenAI
+            res = await self.openai.generate_topics_and_mcqs(context=all_text)
 
-        return res
+            return res
 
     async def generate_level_2(self, collection_name: str) -> dict:
         """
@@ -93,69 +133,170 @@ class AdvanceQuestionGeneratorClass:
         Returns:
             dict: Metadata and generated questions.
         """
-        # Retrieve the extracted text
-        all_text_str = self.collection_texts.get(collection_name)
-        
-        if not all_text_str:
-            all_text_str = self.RAG.get_all_text_str(collection_name)
+        async with self._using_collection(collection_name):
+            # Retrieve the extracted text
+            all_text_str = self.collection_texts.get(collection_name)
+
+            if not all_text_str:
+                all_text_str = self.RAG.get_all_text_str(collection_name)
+
+            # Generate book information asynchronously
+            book_info = await self.openai.generate_book_title(all_text_str)
+            main_topics = book_info.get("main_topics", [])
+
+            all_questions = []
+
+            # Retrieve documents for every topic in one embedding call and one vector query
+            topic_documents = await asyncio.to_thread(
+                self.RAG.fetch_packed_documents_batch, main_topics, collection_name, self.context_packer, top_k=3,
+                mode=self.topic_retrieval_mode
+            )
+
+            # Create a list of tasks for each topic to generate MCQs concurrently
+            tasks = [
+                self._process_topic(topic, collection_name, documents=output)
+                for topic, (results, output) in zip(main_topics, topic_documents)
+            ]
+
+            # Execute all tasks concurrently
+            questions_list = await asyncio.gather(*tasks)
+
+            # Aggregate all questions
+            for questions in questions_list:
+                all_questions.extend(questions)
+
+            # Create metadata object
+            obj = MetadataRAG(
+                total_questions=len(all_questions),
+                book_title=book_info.get("book_title", ""),
+                tool_used=self.openai.model_name,
+                generation_method=self.RAG.method,
+                embedding_model=self.RAG.embeddings_model_name,
+                vectore_store=self.RAG.vector_store
+            )
+
+            return {
+                "metadata": obj.model_dump(),
+                "questions": all_questions
+            }
 
-        # Generate book information asynchronously
-        book_info = await self.openai.generate_book_title(all_text_str)
-        main_topics = book_info.get("main_topics", [])
+    async def generate_chat_RAG(self, question, collection_name):
+        """
+        Generates an answer to a user's question using Retrieval-Augmented Generation (RAG).
 
-        all_questions = []
+        Args:
+            question (str): The user's question.
+            collection_name (str): Name of the collection.
 
-        # Create a list of tasks for each topic to generate MCQs concurrently
-        tasks = [
-            self._process_topic(topic, collection_name)
-            for topic in main_topics
-        ]
+        Returns:
+            tuple: Answer from the LLM and the relevant documents.
+        """
+        async with self._using_collection(collection_name):
+            # Fetch relevant documents for this question from this collection
+            print("Fetching ReleVant documents")
+            results, output = await asyncio.to_thread(
+                self.RAG.fetch_packed_documents, question, collection_name, self.context_packer, top_k=3,
+                mode=self.chat_retrieval_mode
+            )
+            print("Fetched ReleVant documents")
+
+            context = await self._process_documents_context(output)
+            print("Going for Chat")
+            ans = await self.openai.chat(context=context, question=question)
+
+            return ans, output
+
+    async def delete_collection(self, collection_name: str):
+        """
+        Deletes one ingested collection from the vector store and the registry, and drops
+        it from this instance's caches. Other collections are left untouched.
 
-        # Execute all tasks concurrently
-        questions_list = await asyncio.gather(*tasks)
-
-        # Aggregate all questions
-        for questions in questions_list:
-            all_questions.extend(questions)
-
-        # Create metadata object
-        obj = MetadataRAG(
-            total_questions=len(all_questions),
-            book_title=book_info.get("book_title", ""),
-            tool_used=self.openai.model_name,
-            generation_method=self.RAG.method,
-            embedding_model=self.RAG.embeddings_model_name,
-            vectore_store=self.RAG.vector_store
-        )
+        Args:
+            collection_name (str): Name of the collection.
 
-        return {
-            "metadata": obj.model_dump(),
-            "questions": all_questions
-        }
+        Raises:
+            ValueError: If the collection does not exist.
+        """
+        if not (self.tiers.is_archived(collection_name) and not self.RAG.collection_exists(collection_name)):
+            await asyncio.to_thread(self.RAG.delete_collection, collection_name)
+        self.tiers.remove(collection_name)
+        self.forget_collection(collection_name)
+        self.registry.remove_collection(collection_name)
 
-    async def generate_chat_RAG(self, question, collection_name):
+    def _is_collection_taken(self, collection_name: str, content_hash: str) -> bool:
         """
-        Generates an answer to a user's question using Retrieval-Augmented Generation (RAG).
+        Checks whether a collection name already belongs to a different PDF: registered for
+        another content hash, archived, or in the vector store without this content hash
+        (collections from before the registry, or interrupted ingests of another PDF).
 
         Args:
-            question (str): The user's question.
             collection_name (str): Name of the collection.
+            content_hash (str): SHA-256 of the PDF content.
 
         Returns:
-            tuple: Answer from the LLM and the relevant documents.
+            bool: True if the PDF must be stored under another name.
         """
-        # Fetch relevant documents for this question from this collection
-        print("Fetching ReleVant documents")
-        results, output = await asyncio.to_thread(
-            self.RAG.fetch_relevant_documents, question, collection_name, top_k=3
-        )
-        print("Fetched ReleVant documents")
+        if self.registry.is_collection_taken(collection_name, content_hash):
+            return True
+        if self.RAG.collection_exists(collection_name):
+            return self.RAG.get_ingest_progress(collection_name).get("content_hash") != content_hash
+        return self.tiers.is_archived(collection_name)
 
-        context = await self._process_documents_context(output)
-        print("Going for Chat")
-        ans = await self.openai.chat(context=context, question=question)
+    def forget_collection(self, collection_name: str):
+        """
+        Drops a collection from this instance's caches, e.g. after another instance deleted it.
 
-        return ans, output
+        Args:
+            collection_name (str): Name of the collection.
+        """
+        self._evict_collection(collection_name)
+        self.ingested_pdfs = [
+            content_hash for content_hash in self.ingested_pdfs
+            if self.registry.get(content_hash) != collection_name
+        ]
+        self.registry.reload()
+
+    def _evict_collection(self, collection_name: str):
+        """
+        Drops the in-memory text and index handles of a collection; called by the tier
+        manager when the collection leaves the hot tier.
+        """
+        self.collection_texts.pop(collection_name, None)
+        self.RAG.forget_collection(collection_name)
+
+    async def _use_collection(self, collection_name: str) -> bool:
+        """
+        Marks a collection as recently used, rehydrating it first if it was archived.
+
+        Returns:
+            bool: True if the collection exists.
+        """
+        return await asyncio.to_thread(self.tiers.touch, collection_name, self.RAG)
+
+    @asynccontextmanager
+    async def _using_collection(self, collection_name: str):
+        """
+        Marks a collection as used, rehydrating it first if it was archived, and keeps it
+        from being archived until the block exits.
+
+        Raises:
+            ValueError: If the collection does not exist.
+        """
+        if not await asyncio.to_thread(self.tiers.acquire, collection_name, self.RAG):
+            raise ValueError(f"Collection '{collection_name}' does not exist.")
+        try:
+            yield
+        finally:
+            self.tiers.release(collection_name)
+
+    async def compact_storage(self) -> dict:
+        """
+        Reclaims the disk space of deleted collections in the vector store.
+
+        Returns:
+            dict: 'bytes_before' and 'bytes_after'.
+        """
+        return await asyncio.to_thread(self.RAG.compact)
 
     async def reset_data(self):
         """
@@ -164,6 +305,8 @@ class AdvanceQuestionGeneratorClass:
         self.ingested_pdfs = []
         self.collection_texts = {}
         await asyncio.to_thread(self.RAG.reset_client)
+        self.tiers.clear()
+        self.registry.clear()
 
     async def _process_input_pdf(self, pdf_name: str) -> str:
         """
@@ -198,23 +341,27 @@ class AdvanceQuestionGeneratorClass:
             context += context_n
         return context
 
-    async def _process_topic(self, topic: str, collection_name: str) -> list:
+    async def _process_topic(self, topic: str, collection_name: str, documents: list = None) -> list:
         """
         Asynchronously process a single topic to generate MCQs.
 
         Args:
             topic (str): The topic for which to generate questions.
             collection_name (str): Name of the RAG collection.
+            documents (list): Documents already retrieved for the topic; fetched from RAG if omitted.
 
         Returns:
             list: List of generated questions for the topic.
         """
         print(f"Processing topic: {topic}")
 
-        # Fetch relevant documents from RAG in a separate thread
-        results, output = await asyncio.to_thread(
-            self.RAG.fetch_relevant_documents, topic, collection_name, top_k=1
-        )
+        output = documents
+        if output is None:
+            # Fetch relevant documents from RAG in a separate thread
+            results, output = await asyncio.to_thread(
+                self.RAG.fetch_packed_documents, topic, collection_name, self.context_packer, top_k=3,
+                mode=self.topic_retrieval_mode
+            )
 
         # Process the fetched documents to create context
         context = await self._process_documents_context(output)
@@ -1,38 +1,64 @@
 import asyncio
-from SimplerLLM.language.llm import LLM, LLMProvider
-from SimplerLLM.language.llm_addons import generate_pydantic_json_model as gen_json
-from SimplerLLM.language.llm import GeminiLLM
 from src.constants import QuestionsModel, BookInfo, Metadata, ChatResponse
 import json
 from dotenv import load_dotenv
 import os
+from .prompt_registry import PromptRegistry, PromptTemplate
+from .llm_response_cache import LLMResponseCache
 
 load_dotenv()
 
+# SimplerLLM pulls in every provider SDK, so it is imported on first use instead of at module load.
+def gen_json(*args, **kwargs):
+    from SimplerLLM.language.llm_addons import generate_pydantic_json_model
+    return generate_pydantic_json_model(*args, **kwargs)
+
 class OpenAiRunnerClass:
     def __init__(self, model_name: str = "gemini-1.5-pro", openai_key  = None, temperature = 0) -> None:
         self.model_name = model_name
         if not model_name:
             self.model_name = "gemini-1.5-flash"
 
-        with open(r"src/constants/level_1_question_prompt.prompt", "r",encoding = "utf-8") as f:
-            self.question_prompt = f.read()
-        
-        with open(r"src/constants/level_1_topics.prompt", "r",encoding = "utf-8") as f:
-            self.topics_prompt = f.read()
-        
-        with open(r"src/constants/chat_prompt.prompt", "r",encoding = "utf-8") as f:
-            self.chat_prompt = f.read()
-        
+        # Templates are loaded and validated once per process, not per instance
+        self.prompts = PromptRegistry.shared()
+        self.temperature = temperature
+        # Shared on-disk cache of structured responses; which call sites use it is configurable
+        self.response_cache = LLMResponseCache.shared()
+
         if not openai_key:
             self.openai_key = os.getenv("GEMINI_API_KEY")
         else:
             self.openai_key = openai_key
+        from SimplerLLM.language.llm import LLM, LLMProvider
         self.llm_instance = LLM.create(provider=LLMProvider.GEMINI, model_name=self.model_name, api_key=self.openai_key, temperature=temperature)
-    def _format_prompt_mcq(self, context: str, prompt: str, topic: str, n: int) -> str:
+
+    @property
+    def question_prompt(self) -> PromptTemplate:
+        return self.prompts.get("level_1_question_prompt")
+
+    @property
+    def topics_prompt(self) -> PromptTemplate:
+        return self.prompts.get("level_1_topics")
+
+    @property
+    def chat_prompt(self) -> PromptTemplate:
+        return self.prompts.get("chat_prompt")
+
+    def _generate_json(self, call_site: str, model_class, prompt: str):
+        """
+        Calls gen_json for the prompt, going through the response cache for enabled call sites.
+        """
+        cached = self.response_cache.get(call_site, self.model_name, self.temperature, model_class, prompt)
+        if cached is not None:
+            return cached
+        response = gen_json(model_class=model_class, prompt=prompt, llm_instance=self.llm_instance)
+        self.response_cache.put(call_site, self.model_name, self.temperature, model_class, prompt, response)
+        return response
+
+    def _format_prompt_mcq(self, context: str, prompt: PromptTemplate, topic: str, n: int) -> str:
         return prompt.format(context=context, topic=topic, n=n)
     
-    def _format_prompt(self, context: str, prompt: str) -> str:
+    def _format_prompt(self, context: str, prompt: PromptTemplate) -> str:
         return prompt.format(context=context)
     
     def _format_prompt_chat(self, context, question, prompt):
@@ -47,7 +73,7 @@ class OpenAiRunnerClass:
         try:
             # Run the synchronous gen_json in a separate thread
             json_response = await asyncio.to_thread(
-                gen_json, model_class=QuestionsModel, prompt=prompt, llm_instance=self.llm_instance
+                self._generate_json, "generate_mcqs", QuestionsModel, prompt
             )
         except Exception as e:
             print("Exception: ", str(e))
@@ -77,7 +103,7 @@ class OpenAiRunnerClass:
         print("Calling endpoint")
         try:
             
-            answer = gen_json(llm_instance=self.llm_instance, model_class=ChatResponse, prompt=prompt)
+            answer = self._generate_json("chat", ChatResponse, prompt)
             print("Received Answer", answer)
         except Exception as e:
             print("Exception: ", str(e))
@@ -111,7 +137,7 @@ class OpenAiRunnerClass:
         try:
             # Run the synchronous gen_json in a separate thread
             json_response = await asyncio.to_thread(
-                gen_json, model_class=BookInfo, prompt=prompt, llm_instance=self.llm_instance
+                self._generate_json, "generate_book_title", BookInfo, prompt
             )
         except Exception as e:
             print("Exception: ", str(e))
@@ -1,33 +1,47 @@
 import os
+import shutil
+import sqlite3
 import sys
-from typing import Dict, Any, List, Optional
-import google.generativeai as genai
-import chromadb
-from chromadb.config import Settings
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
 import json
-from sentence_transformers import SentenceTransformer
-# use directly
-
-from chromadb.utils.embedding_functions.google_embedding_function import GoogleGenerativeAiEmbeddingFunction
-
+from .embedding_cache import EmbeddingCache
+from .vector_store_base import BaseVectorStore
 
+# chromadb, sentence_transformers (torch) and google.generativeai are imported where they
+# are first needed, so importing this module stays cheap and the Gemini-only deployments
+# never load torch.
 
 
 load_dotenv()
 
 
-class ChromaVectorStore:
+class ChromaVectorStore(BaseVectorStore):
     """
     A class to handle storing and querying documents in Chroma Vector Store using Hugging Face embeddings.
     """
 
+    vector_store = "Chroma"
+
+    # One write lock per persist directory, shared by every store instance on it. Writes
+    # hold it so compaction never sees a segment directory without its row, nor VACUUMs
+    # under a concurrent write.
+    _write_locks: Dict[str, threading.Lock] = {}
+    _write_locks_guard = threading.Lock()
+
     def __init__(
         self,
         openai_api_key: Optional[str] = os.getenv("GEMINI_API_KEY"),
         chroma_db_impl: str = "duckdb+parquet",
         persist_directory: str = "./data/chroma_db",
         model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        chunk_size: int = 200,
+        chunk_overlap: int = 32,
+        embedding_batch_size: int = 64,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        use_embedding_cache: bool = True,
     ):
         """
         Initializes the ChromaVectorStore with the provided configurations.
@@ -36,222 +50,268 @@ class ChromaVectorStore:
         :param chroma_db_impl: Implementation of the Chroma database. Defaults to 'duckdb+parquet'.
         :param persist_directory: Directory where Chroma will persist the database.
         :param embedding_model: The Hugging Face embedding model to use.
+        :param chunk_size: Maximum number of tokens per stored chunk.
+        :param chunk_overlap: Number of tokens shared by consecutive chunks of a page.
+        :param embedding_batch_size: Number of texts encoded per forward pass of the local model.
+        :param embedding_cache: Embedding cache to use. Defaults to the shared cache stored next to persist_directory.
+        :param use_embedding_cache: Set to False to always compute document embeddings.
         """
-       
-        # Set OpenAI API key (Not used in Hugging Face embeddings, kept for compatibility)
-        if openai_api_key:
-            self.openai_api_key = openai_api_key
-            self.model = "models/text-embedding-004"
-            self.embedding_model  = GoogleGenerativeAiEmbeddingFunction(api_key=self.openai_api_key,model_name= self.openai_api_key)
-            self.google_ef  = GoogleGenerativeAiEmbeddingFunction(api_key=self.openai_api_key,model_name= self.model, task_type="RETRIEVAL_DOCUMENT")
-            self.google_ef_r  = GoogleGenerativeAiEmbeddingFunction(api_key=self.openai_api_key,model_name= self.model, task_type="RETRIEVAL_QUERY")
-           
-        else:
-            self.openai_api_key = None
-            self.model = model
-            try:
-                self.embedding_model = SentenceTransformer(model)
-            except Exception as e:
-                print(f"Error loading embedding model '{model}': {e}")
-
-
-        self.embeddings_model_name = self.model
-        self.method = "RAG Pipeline"
-        self.vector_store = "Chroma"
-
-        # Initialize the Hugging Face embedding model
-
-       
+        super().__init__(
+            openai_api_key=openai_api_key,
+            persist_directory=persist_directory,
+            model=model,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            embedding_batch_size=embedding_batch_size,
+            embedding_cache=embedding_cache,
+            use_embedding_cache=use_embedding_cache,
+        )
 
         # Initialize Chroma client
+        import chromadb
+        from chromadb.config import Settings
+
         self.chroma_client = chromadb.PersistentClient(
             path=persist_directory,
             settings=Settings(allow_reset=True)
         )
+        self._collections = {}  # Resolved collection handles by name
+        with ChromaVectorStore._write_locks_guard:
+            self._write_lock = ChromaVectorStore._write_locks.setdefault(
+                os.path.abspath(persist_directory), threading.Lock()
+            )
 
-    def get_or_create_collection(self, collection_name: str):
+    def get_collection(self, collection_name: str):
         """
-        Retrieves an existing collection or creates a new one if it doesn't exist.
+        Returns the handle of an existing collection, resolving it once and caching it.
 
-        :param collection_name: The name of the collection to retrieve or create.
+        :param collection_name: The name of the collection to retrieve.
         :return: The Chroma collection object.
+        :raises ValueError: If the collection does not exist.
         """
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
         try:
             if self.openai_api_key:
                 collection = self.chroma_client.get_collection(name=collection_name, embedding_function=self.google_ef_r)
             else:
                 collection = self.chroma_client.get_collection(name=collection_name)
+        except Exception as e:
+            raise ValueError(f"Collection '{collection_name}' does not exist.") from e
 
-            print(f"Using existing collection: '{collection_name}'")
-        except Exception:
-            if self.openai_api_key:
-                collection = self.chroma_client.create_collection(name=collection_name, embedding_function=self.google_ef)
-                print(collection._embedding_function)
-            else:
-                collection = self.chroma_client.create_collection(name=collection_name)
-                
-            print(f"Created new collection: '{collection_name}'")
+        print(f"Using existing collection: '{collection_name}'")
+        self._collections[collection_name] = collection
         return collection
-    
-    def get_all_text(self, collection_name:str):
-        collection = self.get_or_create_collection(collection_name)
-        return collection.get(include=['documents'])['documents']
-    def get_all_text_str(self, collection_name):
-        collection = self.get_or_create_collection(collection_name)
-        docs = collection.get(include=['documents'])['documents']
-
-        return " ".join(docs)
-
 
-    def get_embedding(self, text: str) -> List[float]:
+    def get_or_create_collection(self, collection_name: str, metadata: Optional[dict] = None):
         """
-        Generates an embedding for the given text using the Hugging Face model.
+        Retrieves an existing collection or creates a new one if it doesn't exist.
+
+        Only the ingestion path creates collections; read paths use `get_collection`.
 
-        :param text: The text to embed.
-        :return: A list of floats representing the embedding.
+        :param collection_name: The name of the collection to retrieve or create.
+        :param metadata: Metadata of the collection if it is created.
+        :return: The Chroma collection object.
         """
         try:
+            return self.get_collection(collection_name)
+        except ValueError:
+            pass
+
+        with self._write_lock:
             if self.openai_api_key:
-                embedding = genai.embed_content(model =self.model, content = text, task_type="retrieval_query").get("embedding")
+                collection = self.chroma_client.create_collection(
+                    name=collection_name, embedding_function=self.google_ef, metadata=metadata or None
+                )
             else:
-                embedding = self.embedding_model.encode(text, convert_to_numpy=True).tolist()
-            return embedding
-        except Exception as e:
-            print(f"Error generating embedding with Hugging Face model: {e}")
+                collection = self.chroma_client.create_collection(name=collection_name, metadata=metadata or None)
 
-    def store_texts(self, pages: Dict[int, str], collection_name: str) -> None:
+        print(f"Created new collection: '{collection_name}'")
+        self._collections[collection_name] = collection
+        return collection
+    
+    def collection_exists(self, collection_name: str) -> bool:
         """
-        Stores text data from pages into the specified Chroma vector store collection with embeddings and metadata.
+        Checks whether a collection exists without creating it.
 
-        :param pages: A dictionary with page numbers as keys and text content as values.
-        :param collection_name: The name of the collection where documents will be stored.
+        :param collection_name: The name of the collection to look up.
+        :return: True if the collection exists.
         """
-        collection = self.get_or_create_collection(collection_name)
-
-        # Fetch existing IDs to avoid duplicates
         try:
-            existing_docs = collection.get(ids=[f"page_{page_num}" for page_num in pages.keys()])
-            existing_ids = set(existing_docs["ids"])
-        except Exception as e:
-            print(f"Error fetching existing document IDs: {e}")
-            existing_ids = set()
-
-        texts = []
-        embeddings = []
-        metadatas = []
-        ids = []
-
-        for page_num, text in pages.items():
-            doc_id = f"page_{page_num}"
-            if doc_id in existing_ids:
-                print(f"Document with ID '{doc_id}' already exists. Skipping to avoid duplicates.")
-                continue  # Skip adding this document
-
-            if not text.strip():
-                print(f"Warning: Page {page_num} is empty. Skipping.")
-                continue
-            if not self.openai_api_key:
-                try:
-                    print("NO API KEY in store")
-                    embedding = self.get_embedding(text)
-                except Exception as e:
-                    print(f"Failed to generate embedding for page {page_num}: {e}")
-                    continue
-                embeddings.append(embedding)
-            else:
-                print("Using GEMINI in store")
-            
+            self.get_collection(collection_name)
+            return True
+        except ValueError:
+            return False
 
-            texts.append(text)
-            metadatas.append({"page_number": page_num})
-            ids.append(doc_id)
-        embeddings = None
+    def get_all_text(self, collection_name:str):
+        collection = self.get_collection(collection_name)
+        stored = collection.get(include=['documents', 'metadatas'])
+        return self.chunker.merge_chunks(stored['documents'], stored['metadatas'])
 
-        if texts:
-            try:
-                if embeddings:
-                    collection.add(
-                        documents=texts,
-                        embeddings=embeddings,
-                        metadatas=metadatas,
-                        ids=ids,
-                    )
-                else:
-                    collection.add(
-                        documents=texts,
-                        metadatas=metadatas,
-                        ids=ids,)
-
-                print(f"Successfully added {len(texts)} documents to collection '{collection_name}'.")
-            except Exception as e:
-                print(f"Error adding documents to collection '{collection_name}': {e}")
-        else:
-            print(f"No valid texts to add to collection '{collection_name}'.")
-
-    def fetch_relevant_documents(
-        self, topic: str, collection_name: str, top_k: int = 5
-    ) -> List[Dict[str, Any]]:
+    def get_ingest_progress(self, collection_name: str) -> Dict[str, Any]:
         """
-        Fetches top_k relevant documents from the specified Chroma collection based on the topic.
+        Returns the ingestion progress marker of a collection.
 
-        :param topic: The topic to search for.
-        :param collection_name: The name of the collection to query.
-        :param top_k: The number of top documents to retrieve.
-        :return: A tuple containing the raw results and a list of dictionaries with the document, metadata, and confidence score.
+        :param collection_name: The name of the collection.
+        :return: A dictionary with 'pages_committed' and 'pages_total' (zero if unknown) and
+            the 'content_hash' of the ingested document (None if unknown).
         """
-        collection = self.get_or_create_collection(collection_name)
-        results = {
-            "documents": ["None"],
-            "metadatas":[{}],
-            "distances":[0]
-            
+        try:
+            metadata = self.get_collection(collection_name).metadata or {}
+        except ValueError:
+            metadata = {}
+        return {
+            "pages_committed": metadata.get("pages_committed", 0),
+            "pages_total": metadata.get("pages_total", 0),
+            "content_hash": metadata.get("content_hash"),
         }
 
+    def _update_ingest_progress(self, collection_name: str, pages_committed: int, pages_total: int) -> None:
+        """
+        Records how many pages of the collection are committed in the collection metadata.
+        """
+        collection = self.get_collection(collection_name)
+        metadata = {
+            key: value for key, value in (collection.metadata or {}).items()
+            if not key.startswith("hnsw:")
+        }
+        metadata.update({"pages_committed": pages_committed, "pages_total": pages_total})
         try:
-            if self.openai_api_key:
-                print("Fetching docs using Gemini")
-                results = collection.query(
-                    query_texts=[topic],
-                    n_results=top_k,
-                    include=["metadatas", "distances", "documents"]
-                )
-            else:
-                    try:
-                        query_embedding = self.get_embedding(topic)
-                        print("QUERY EMBEDDING SIZE", len(query_embedding))
-                    except Exception as e:
-                        print(f"Failed to generate embedding for the topic: {e}")
-
-                    print("Fetching docs using Sentence")
-                    results = collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=top_k,
-                    include=["metadatas", "distances", "documents"]
-                )
+            with self._write_lock:
+                collection.modify(metadata=metadata)
         except Exception as e:
-            print(f"Error querying the Chroma collection '{collection_name}': {e}")
-
-        fetched_docs = []
-        # Access the first (and only) query's results
-        documents = results["documents"][0]
-        metadatas = results["metadatas"][0]
-        distances = results["distances"][0]
-
-        for doc, metadata, distance in zip(documents, metadatas, distances):
-            confidence = max(0.0, 1.0 - distance)  # Simple normalization
-            fetched_docs.append(
-                {
-                    "document": doc,
-                    "metadata": metadata,
-                    "confidence": round(confidence, 4),
-                }
+            print(f"Error updating ingest progress of collection '{collection_name}': {e}")
+
+    def _prepare_collection(self, collection_name: str, content_hash: Optional[str] = None) -> None:
+        self.get_or_create_collection(collection_name, {"content_hash": content_hash} if content_hash else None)
+
+    def _existing_ids(self, collection_name: str, ids: List[str]) -> List[str]:
+        return self.get_collection(collection_name).get(ids=ids, include=[])["ids"]
+
+    def _add(self, collection_name: str, ids: List[str], texts: List[str], embeddings: List[List[float]], metadatas: List[dict]) -> None:
+        collection = self.get_collection(collection_name)
+        with self._write_lock:
+            collection.add(
+                documents=texts,
+                embeddings=embeddings,
+                metadatas=metadatas,
+                ids=ids,
             )
 
-        return results, fetched_docs
+    def _query(self, collection_name: str, query_embeddings: List[List[float]], top_k: int) -> Dict[str, list]:
+        return self.get_collection(collection_name).query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            include=["metadatas", "distances", "documents"]
+        )
+
+    def _all_records(self, collection_name: str) -> Tuple[List[str], List[str]]:
+        stored = self.get_collection(collection_name).get(include=["documents"])
+        return stored["ids"], stored["documents"]
+
+    def _get_records(self, collection_name: str, ids: List[str]) -> Tuple[List[str], List[dict]]:
+        stored = self.get_collection(collection_name).get(ids=ids, include=["documents", "metadatas"])
+        # Chroma does not return ids in the requested order
+        records = dict(zip(stored["ids"], zip(stored["documents"], stored["metadatas"])))
+        return [records[id_][0] for id_ in ids], [records[id_][1] for id_ in ids]
+
+    def _get_embeddings(self, collection_name: str, ids: List[str]):
+        import numpy as np
+
+        stored = self.get_collection(collection_name).get(ids=ids, include=["embeddings"])
+        # Chroma does not return ids in the requested order
+        rows = dict(zip(stored["ids"], stored["embeddings"]))
+        return np.asarray([rows[id_] for id_ in ids], dtype=np.float32)
+
+    def _export_records(self, collection_name: str):
+        import numpy as np
+
+        stored = self.get_collection(collection_name).get(include=["documents", "metadatas", "embeddings"])
+        return stored["ids"], stored["documents"], stored["metadatas"], np.asarray(stored["embeddings"], dtype=np.float32)
+
+    def forget_collection(self, collection_name: str) -> None:
+        super().forget_collection(collection_name)
+        self._collections.pop(collection_name, None)
+
+    def delete_collection(self, collection_name: str) -> None:
+        """
+        Deletes one collection and its lexical index. The other collections keep their
+        cached handles and loaded HNSW indexes.
+
+        :param collection_name: The name of the collection to delete.
+        :raises ValueError: If the collection does not exist.
+        """
+        self.get_collection(collection_name)
+        with self._write_lock:
+            self.chroma_client.delete_collection(name=collection_name)
+        self.forget_collection(collection_name)
+        self._delete_lexical_index(collection_name)
+        print(f"Deleted collection: '{collection_name}'")
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Reclaims the disk space of deleted collections.
+
+        Chroma leaves the HNSW segment directories of deleted collections behind and
+        SQLite keeps freed pages, so this removes segment directories no longer listed in
+        the segments table and VACUUMs the database.
+
+        Writes by store instances in this process are blocked meanwhile. For writers in other
+        processes, a directory is only removed if it predates the start of compaction and
+        is still missing from the segments table right before removal.
+
+        :return: A dictionary with 'bytes_before' and 'bytes_after'.
+        """
+        bytes_before = self.disk_usage()
+        sqlite_path = os.path.join(self.persist_directory, "chroma.sqlite3")
+        with self._write_lock:
+            started = time.time()
+            connection = sqlite3.connect(sqlite_path, timeout=30)
+            try:
+                live_segments = {row[0] for row in connection.execute("SELECT id FROM segments")}
+                for name in os.listdir(self.persist_directory):
+                    path = os.path.join(self.persist_directory, name)
+                    # Segment directories are named by their UUID
+                    if not (os.path.isdir(path) and len(name) == 36 and name.count("-") == 4) or name in live_segments:
+                        continue
+                    if os.path.getmtime(path) >= started:
+                        continue
+                    if connection.execute("SELECT 1 FROM segments WHERE id = ?", (name,)).fetchone():
+                        continue
+                    shutil.rmtree(path)
+                connection.execute("VACUUM")
+            finally:
+                connection.close()
+        bytes_after = self.disk_usage()
+        print(f"Compacted '{self.persist_directory}': {bytes_before} -> {bytes_after} bytes.")
+        return {"bytes_before": bytes_before, "bytes_after": bytes_after}
 
     def reset_client(self):
+        self._collections = {}
+        self._reset_lexical_indexes()
         return self.chroma_client.reset()
 
+
+def create_vector_store(backend: str = "chroma", **kwargs) -> BaseVectorStore:
+    """
+    Creates a vector store for the given backend name.
+
+    :param backend: 'chroma' or 'numpy'.
+    :param kwargs: Passed to the backend's constructor.
+    :return: The vector store.
+    :raises ValueError: If the backend is unknown.
+    """
+    backend = (backend or "chroma").lower()
+    if backend == "chroma":
+        return ChromaVectorStore(**kwargs)
+    if backend == "numpy":
+        from .numpy_vector_store import NumpyVectorStore
+
+        kwargs.pop("chroma_db_impl", None)
+        return NumpyVectorStore(**kwargs)
+    raise ValueError(f"Unknown vector store backend '{backend}'. Use 'chroma' or 'numpy'.")
+
 if __name__ == "__main__":
     
     chroma_store = ChromaVectorStore(openai_api_key= None)
@@ -1 +1,4 @@
-from .AdvanceQuestionGenerator import AdvanceQuestionGeneratorClass
\ No newline at end of file
+from .AdvanceQuestionGenerator import AdvanceQuestionGeneratorClass
+from .ingestion_jobs import IngestionJobManager
+from .llm_response_cache import LLMResponseCache
+from .embedding_cache import query_embedding_cache
\ No newline at end of file
@@ -0,0 +1,78 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from .text_chunker import TextChunker
+
+# A normalized margin line that is only a page number, e.g. "12", "Page 3", "- 4 -", "5 of 120"
+PAGE_NUMBER_PATTERN = re.compile(r"^[-–\s]*(page\s*)?#(\s*(of|/)\s*#)?[-–\s]*$")
+
+
+class BoilerplateStripper:
+    """
+    Removes running headers, footers, page numbers and other lines repeated across pages.
+
+    Works on PyMuPDF text blocks: only lines of blocks lying in the top or bottom margin
+    band are candidates, and a candidate is removed when its normalized form (digits
+    collapsed, case and whitespace folded) appears in the margins of enough pages.
+    """
+
+    def __init__(self, margin_ratio: float = 0.1, min_page_ratio: float = 0.5, min_pages: int = 3):
+        """
+        :param margin_ratio: Height of the top and bottom margin bands as a fraction of the page height.
+        :param min_page_ratio: Fraction of pages a margin line must appear on to count as boilerplate.
+        :param min_pages: Minimum number of pages a margin line must appear on to count as boilerplate.
+        """
+        self.margin_ratio = margin_ratio
+        self.min_page_ratio = min_page_ratio
+        self.min_pages = min_pages
+
+    @staticmethod
+    def _normalize(line: str) -> str:
+        return re.sub(r"\d+", "#", " ".join(line.split()).lower())
+
+    def _in_margin(self, y0: float, y1: float, height: float) -> bool:
+        band = height * self.margin_ratio
+        return y1 <= band or y0 >= height - band
+
+    def strip(self, page_blocks: Dict[str, Tuple[float, List[Tuple[float, float, str]]]]) -> Tuple[Dict[str, str], dict]:
+        """
+        Rebuilds page texts from text blocks without the repeated boilerplate lines.
+
+        :param page_blocks: Page number -> (page height, [(y0, y1, block text), ...]).
+        :return: A tuple (pages, stats) where pages maps page numbers to cleaned text and
+                 stats reports the lines, characters and approximate tokens removed.
+        """
+        counts = Counter()
+        for height, blocks in page_blocks.values():
+            keys = set()
+            for y0, y1, text in blocks:
+                if self._in_margin(y0, y1, height):
+                    keys.update(self._normalize(line) for line in text.splitlines())
+            keys.discard("")
+            counts.update(keys)
+
+        threshold = max(self.min_pages, math.ceil(self.min_page_ratio * len(page_blocks)))
+        boilerplate = {key for key, count in counts.items() if count >= threshold}
+
+        pages = {}
+        removed_lines = []
+        for page_number, (height, blocks) in page_blocks.items():
+            page_text = ""
+            for y0, y1, text in blocks:
+                in_margin = self._in_margin(y0, y1, height)
+                for line in text.splitlines():
+                    key = self._normalize(line)
+                    if in_margin and key and (key in boilerplate or PAGE_NUMBER_PATTERN.match(key)):
+                        removed_lines.append(line)
+                        continue
+                    page_text += line + "\n"
+            pages[page_number] = page_text
+
+        stats = {
+            "lines_removed": len(removed_lines),
+            "chars_removed": sum(len(line) + 1 for line in removed_lines),
+            "tokens_removed": sum(TextChunker.count_tokens(line) for line in removed_lines),
+        }
+        return pages, stats
@@ -0,0 +1,318 @@
+import atexit
+import io
+import json
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict
+
+
+class CollectionTierManager:
+    """
+    Keeps memory and disk proportional to the working set of collections.
+
+    Collections move through three tiers:
+
+    - hot: the max_hot most recently used collections; their handles, indexes and
+      extracted texts stay in memory,
+    - warm: still in the vector store, but every subscriber has dropped its in-memory
+      state for them,
+    - cold: unused for archive_after_seconds; exported with their embeddings to a
+      compressed archive file and deleted from the vector store.
+
+    `touch` marks a collection as used and rehydrates it from its archive first if it
+    is cold, so callers only need to touch a collection before reading it; readers that
+    hold on to a collection use `acquire` and `release` instead, so the sweep never
+    archives a collection while it is being read. `touch` only
+    updates memory: a background sweep every sweep_interval seconds archives idle
+    collections and persists the last-use times next to the archives (also at exit), so
+    requests never wait on either and tiers survive restarts.
+
+    One manager is shared per archive directory (see `shared`), since every pooled
+    generator reads the same vector store.
+    """
+
+    _instances: Dict[str, "CollectionTierManager"] = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, archive_directory: str, **kwargs) -> "CollectionTierManager":
+        """
+        Returns the process-wide manager for archive_directory, creating it on first use.
+        """
+        key = os.path.abspath(archive_directory)
+        with cls._instances_lock:
+            manager = cls._instances.get(key)
+            if manager is None:
+                manager = cls(archive_directory, **kwargs)
+                cls._instances[key] = manager
+            return manager
+
+    def __init__(
+        self,
+        archive_directory: str = "./data/collection_archive",
+        max_hot: int = int(os.getenv("COLLECTION_MAX_HOT", "8")),
+        archive_after_seconds: float = float(os.getenv("COLLECTION_ARCHIVE_AFTER_SECONDS", "604800")),
+        sweep_interval: float = float(os.getenv("COLLECTION_SWEEP_INTERVAL_SECONDS", "60")),
+    ):
+        """
+        :param archive_directory: Directory holding the archives and the last-use times.
+        :param max_hot: Number of most recently used collections kept in memory.
+        :param archive_after_seconds: Idle time after which a collection is archived. 0 disables archiving.
+        :param sweep_interval: Seconds between two background sweeps. 0 disables the background
+            thread; `sweep` must then be called explicitly.
+        """
+        self.archive_directory = archive_directory
+        self.max_hot = max_hot
+        self.archive_after_seconds = archive_after_seconds
+        self.sweep_interval = sweep_interval
+        self._lock = threading.RLock()
+        self._subscribers = []  # Weak references to evict(collection_name) callbacks
+        self._state_path = os.path.join(archive_directory, "tiers.json")
+        self._last_used: Dict[str, float] = self._load_state()  # Wall-clock times, oldest first
+        self._dirty = False  # Whether _last_used changed since it was last persisted
+        self._hot = []  # Collection names, least recently used first
+        self._in_use: Dict[str, int] = {}  # Collection name -> number of readers holding it
+        self._store = None  # The store archived from by the sweep: the one last passed to touch
+        self._sweeper = None
+        os.makedirs(archive_directory, exist_ok=True)
+        atexit.register(self.flush)
+
+    def _load_state(self) -> Dict[str, float]:
+        try:
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                last_used = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error loading collection tiers '{self._state_path}': {e}")
+            return {}
+        return dict(sorted(last_used.items(), key=lambda item: item[1]))
+
+    def _save_state(self) -> None:
+        tmp_path = f"{self._state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._last_used, f)
+        os.replace(tmp_path, self._state_path)
+        self._dirty = False
+
+    def flush(self) -> None:
+        """
+        Persists the last-use times if they changed since the last save.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_state()
+
+    def _archive_path(self, collection_name: str) -> str:
+        return os.path.join(self.archive_directory, f"{collection_name}.npz")
+
+    def subscribe(self, evict: Callable[[str], None]) -> None:
+        """
+        Registers a bound method called with a collection name whenever that collection
+        leaves the hot tier. Only a weak reference is kept, so pooled generators can still
+        be garbage collected.
+        """
+        with self._lock:
+            self._subscribers.append(weakref.WeakMethod(evict))
+
+    def _evict(self, collection_name: str) -> None:
+        alive = []
+        for reference in self._subscribers:
+            evict = reference()
+            if evict is None:
+                continue
+            alive.append(reference)
+            try:
+                evict(collection_name)
+            except Exception as e:
+                print(f"Error evicting collection '{collection_name}': {e}")
+        self._subscribers = alive
+
+    def is_archived(self, collection_name: str) -> bool:
+        return os.path.exists(self._archive_path(collection_name))
+
+    def touch(self, collection_name: str, store) -> bool:
+        """
+        Marks a collection as used, rehydrating it into store if it is archived, and moves
+        other collections down a tier as needed.
+
+        :param collection_name: The name of the collection about to be read or written.
+        :param store: The vector store to rehydrate into and archive from.
+        :return: True if the collection exists (in the store or restored from its archive).
+        """
+        with self._lock:
+            self._store = store
+            self._start_sweeper()
+            if collection_name in self._hot:
+                self._mark_used(collection_name)
+                return True
+            if self.is_archived(collection_name) and not store.collection_exists(collection_name):
+                self._rehydrate(collection_name, store)
+            exists = store.collection_exists(collection_name)
+            if exists:
+                self._mark_used(collection_name)
+                while len(self._hot) > self.max_hot:
+                    self._evict(self._hot.pop(0))
+            return exists
+
+    def acquire(self, collection_name: str, store) -> bool:
+        """
+        Touches a collection and, if it exists, keeps the sweep from archiving it until
+        `release` is called.
+
+        :param collection_name: The name of the collection about to be read.
+        :param store: The vector store to rehydrate into and archive from.
+        :return: True if the collection exists; `release` must then be called once done.
+        """
+        with self._lock:
+            exists = self.touch(collection_name, store)
+            if exists:
+                self._in_use[collection_name] = self._in_use.get(collection_name, 0) + 1
+            return exists
+
+    def release(self, collection_name: str) -> None:
+        """
+        Releases a collection acquired with `acquire`.
+        """
+        with self._lock:
+            count = self._in_use.get(collection_name, 0) - 1
+            if count > 0:
+                self._in_use[collection_name] = count
+            else:
+                self._in_use.pop(collection_name, None)
+
+    def _mark_used(self, collection_name: str) -> None:
+        self._last_used.pop(collection_name, None)
+        self._last_used[collection_name] = time.time()
+        self._dirty = True
+        if collection_name in self._hot:
+            self._hot.remove(collection_name)
+        self._hot.append(collection_name)
+
+    def _start_sweeper(self) -> None:
+        if self._sweeper is None and self.sweep_interval > 0:
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="collection-tier-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Error sweeping collection tiers: {e}")
+
+    def sweep(self) -> None:
+        """
+        Archives the collections idle for longer than archive_after_seconds, then persists
+        the last-use times if they changed. Collections are archived one at a time, so a
+        request touching a collection waits for at most one archive, and acquired
+        collections are skipped until they are released.
+        """
+        store = self._store
+        if store is not None and self.archive_after_seconds:
+            with self._lock:
+                cutoff = time.time() - self.archive_after_seconds
+                idle = [name for name, last_used in self._last_used.items() if last_used < cutoff]
+            for collection_name in idle:
+                with self._lock:
+                    # Skip collections being read, or used or removed since the list was taken
+                    last_used = self._last_used.get(collection_name)
+                    if last_used is None or last_used >= time.time() - self.archive_after_seconds:
+                        continue
+                    if self._in_use.get(collection_name):
+                        continue
+                    try:
+                        self._archive(collection_name, store)
+                    except Exception as e:
+                        print(f"Error archiving collection '{collection_name}': {e}")
+        self.flush()
+
+    def _archive(self, collection_name: str, store) -> None:
+        """
+        Writes the collection to a compressed archive, then deletes it from the store.
+        """
+        import numpy as np
+
+        if collection_name in self._hot:
+            self._hot.remove(collection_name)
+        self._evict(collection_name)
+        if not store.collection_exists(collection_name):
+            self._last_used.pop(collection_name, None)
+            self._dirty = True
+            return
+
+        data = store.export_collection(collection_name)
+        records = json.dumps({
+            "ids": data["ids"],
+            "documents": data["documents"],
+            "metadatas": data["metadatas"],
+            "progress": data["progress"],
+        }).encode("utf-8")
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            embeddings=np.asarray(data["embeddings"], dtype=np.float32),
+            records=np.frombuffer(records, dtype=np.uint8),
+        )
+        path = self._archive_path(collection_name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+        # The archive is complete before the collection is removed from the store
+        store.delete_collection(collection_name)
+        self._last_used.pop(collection_name, None)
+        self._dirty = True
+        print(f"Archived collection '{collection_name}' ({len(data['ids'])} chunks) to '{path}'.")
+
+    def _rehydrate(self, collection_name: str, store) -> None:
+        """
+        Recreates an archived collection in the store and removes its archive.
+        """
+        import numpy as np
+
+        path = self._archive_path(collection_name)
+        with np.load(path) as archive:
+            embeddings = archive["embeddings"]
+            records = json.loads(archive["records"].tobytes().decode("utf-8"))
+        records["embeddings"] = embeddings
+        store.import_collection(collection_name, records)
+        os.remove(path)
+        print(f"Rehydrated collection '{collection_name}' ({len(records['ids'])} chunks) from '{path}'.")
+
+    def remove(self, collection_name: str) -> None:
+        """
+        Forgets a deleted collection and removes its archive, if any.
+        """
+        with self._lock:
+            if collection_name in self._hot:
+                self._hot.remove(collection_name)
+            self._last_used.pop(collection_name, None)
+            path = self._archive_path(collection_name)
+            if os.path.exists(path):
+                os.remove(path)
+            self._save_state()
+
+    def clear(self) -> None:
+        """
+        Forgets every collection and removes every archive.
+        """
+        with self._lock:
+            for collection_name in list(self._last_used) + list(self._hot):
+                self.remove(collection_name)
+            for name in os.listdir(self.archive_directory):
+                if name.endswith(".npz"):
+                    os.remove(os.path.join(self.archive_directory, name))
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            archived = sorted(name[:-4] for name in os.listdir(self.archive_directory) if name.endswith(".npz"))
+            return {
+                "hot": list(self._hot),
+                "warm": [name for name in self._last_used if name not in self._hot],
+                "archived": archived,
+            }
@@ -0,0 +1,88 @@
+import os
+from typing import Any, Dict, List
+from .text_chunker import TextChunker
+
+
+class ContextPacker:
+    """
+    Selects retrieved chunks for an LLM prompt with maximal marginal relevance (MMR).
+
+    Retrieval returns candidate_factor times more candidates than will be used. Chunks
+    are then picked one at a time by relevance minus their highest similarity to an
+    already picked chunk, so near-duplicates (a summary page and the chapter it
+    summarizes, or overlapping chunks of one page) do not crowd out other sources. Picked
+    chunks are added while they fit in the token budget.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "768")),
+        mmr_lambda: float = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7")),
+        candidate_factor: int = 3,
+    ):
+        """
+        :param token_budget: Maximum number of (approximate) tokens of packed context.
+        :param mmr_lambda: Weight of relevance against novelty, between 0 and 1; 1 ignores redundancy.
+        :param candidate_factor: Number of candidates retrieved per document finally used.
+        """
+        if not 0 <= mmr_lambda <= 1:
+            raise ValueError("mmr_lambda must be between 0 and 1")
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.candidate_factor = max(1, candidate_factor)
+
+    def mmr_order(self, embeddings, relevance) -> List[int]:
+        """
+        Returns candidate indices in MMR order.
+
+        :param embeddings: (n, dim) candidate embeddings.
+        :param relevance: n relevance scores of the candidates for the query.
+        :return: All n indices, most useful first.
+        """
+        import numpy as np
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        relevance = np.asarray(relevance, dtype=np.float32)
+        count = len(relevance)
+        if count == 0:
+            return []
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        similarity = vectors @ vectors.T  # Every pairwise similarity in one product
+
+        order = []
+        remaining = np.ones(count, dtype=bool)
+        max_similarity = np.full(count, -np.inf, dtype=np.float32)
+        for _ in range(count):
+            redundancy = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+            scores = self.mmr_lambda * relevance - (1 - self.mmr_lambda) * redundancy
+            scores[~remaining] = -np.inf
+            best = int(np.argmax(scores))
+            order.append(best)
+            remaining[best] = False
+            max_similarity = np.maximum(max_similarity, similarity[best])
+        return order
+
+    def pack(self, documents: List[Dict[str, Any]], embeddings, relevance, max_documents: int) -> List[Dict[str, Any]]:
+        """
+        Picks up to max_documents documents in MMR order that fit in the token budget.
+
+        The first pick is always kept, even if it alone exceeds the budget.
+
+        :param documents: Candidate documents as returned by `fetch_relevant_documents`.
+        :param embeddings: Their embeddings, in the same order.
+        :param relevance: Their relevance scores for the query, in the same order.
+        :param max_documents: Maximum number of documents to return.
+        :return: The packed documents, most useful first.
+        """
+        packed = []
+        used_tokens = 0
+        for index in self.mmr_order(embeddings, relevance):
+            tokens = TextChunker.count_tokens(documents[index]["document"])
+            if packed and used_tokens + tokens > self.token_budget:
+                continue
+            packed.append(documents[index])
+            used_tokens += tokens
+            if len(packed) >= max_documents:
+                break
+        return packed
@@ -0,0 +1,314 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+
+
+class EmbeddingCache:
+    """
+    A persistent, size-bounded embedding cache shared by every collection.
+
+    Entries are keyed by (model name, task type, SHA-256 of the text). Vectors are stored
+    compactly as rows of one raw float16/float32 file per (model, task type), and a SQLite
+    index maps keys to rows and tracks last use. When the cache exceeds max_entries the
+    least recently used entries are evicted and their rows are reused by later inserts.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, directory: str = "./data/embedding_cache", **kwargs) -> "EmbeddingCache":
+        """
+        Returns the process-wide cache for a directory, so every vector store writes
+        through one index and one set of vector files.
+        """
+        directory = os.path.abspath(directory)
+        with cls._shared_lock:
+            if directory not in cls._shared:
+                cls._shared[directory] = cls(directory, **kwargs)
+            return cls._shared[directory]
+
+    def __init__(self, directory: str = "./data/embedding_cache", max_entries: int = 200_000, dtype: str = "float16"):
+        """
+        :param directory: Directory holding the vector files and the SQLite index.
+        :param max_entries: Maximum number of cached embeddings across all models.
+        :param dtype: Storage precision of the vectors, 'float16' or 'float32'.
+        """
+        if dtype not in ("float16", "float32"):
+            raise ValueError("dtype must be 'float16' or 'float32'")
+        self.directory = directory
+        self.max_entries = max_entries
+        self.dtype = dtype
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS namespaces (namespace TEXT PRIMARY KEY, dim INTEGER NOT NULL, dtype TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL, key TEXT NOT NULL, row INTEGER NOT NULL, last_used REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            CREATE TABLE IF NOT EXISTS free_rows (namespace TEXT NOT NULL, row INTEGER NOT NULL);
+            """
+        )
+        self._db.commit()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _namespace(model: str, task_type: str) -> str:
+        return hashlib.sha1(f"{model}|{task_type}".encode("utf-8")).hexdigest()[:16]
+
+    def _vector_path(self, namespace: str, dtype: str) -> str:
+        return os.path.join(self.directory, f"{namespace}.{dtype}.bin")
+
+    def _namespace_info(self, namespace: str):
+        return self._db.execute("SELECT dim, dtype FROM namespaces WHERE namespace = ?", (namespace,)).fetchone()
+
+    def get_many(self, model: str, task_type: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Looks up cached embeddings.
+
+        :param model: Name of the embedding model.
+        :param task_type: Task type the embeddings were computed for ('' if not applicable).
+        :param texts: The texts to look up.
+        :return: One embedding per text, or None where the text is not cached.
+        """
+        namespace = self._namespace(model, task_type)
+        keys = [self.hash_text(text) for text in texts]
+        with self._lock:
+            info = self._namespace_info(namespace)
+            if info is None:
+                self.misses += len(texts)
+                return [None] * len(texts)
+            import numpy as np
+
+            dim, dtype = info
+
+            rows = {}
+            for start in range(0, len(keys), 500):
+                batch = list(set(keys[start:start + 500]))
+                placeholders = ",".join("?" * len(batch))
+                rows.update(self._db.execute(
+                    f"SELECT key, row FROM entries WHERE namespace = ? AND key IN ({placeholders})",
+                    [namespace, *batch],
+                ).fetchall())
+            if not rows:
+                self.misses += len(texts)
+                return [None] * len(texts)
+
+            now = time.time()
+            self._db.executemany(
+                "UPDATE entries SET last_used = ? WHERE namespace = ? AND key = ?",
+                [(now, namespace, key) for key in rows],
+            )
+            self._db.commit()
+
+            vectors = np.memmap(self._vector_path(namespace, dtype), dtype=dtype, mode="r").reshape(-1, dim)
+            results = [
+                vectors[rows[key]].astype(np.float32).tolist() if key in rows else None
+                for key in keys
+            ]
+            del vectors
+
+        hits = sum(result is not None for result in results)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model: str, task_type: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """
+        Stores embeddings, evicting the least recently used entries beyond max_entries.
+
+        :param model: Name of the embedding model.
+        :param task_type: Task type the embeddings were computed for ('' if not applicable).
+        :param texts: The embedded texts.
+        :param embeddings: One embedding per text.
+        """
+        if not texts:
+            return
+        import numpy as np
+
+        namespace = self._namespace(model, task_type)
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            info = self._namespace_info(namespace)
+            if info is None:
+                info = (matrix.shape[1], self.dtype)
+                self._db.execute("INSERT INTO namespaces VALUES (?, ?, ?)", (namespace, *info))
+            dim, dtype = info
+            if matrix.shape[1] != dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match cached dimension {dim}")
+
+            path = self._vector_path(namespace, dtype)
+            row_bytes = dim * np.dtype(dtype).itemsize
+            next_row = os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+            now = time.time()
+
+            with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+                for text, vector in zip(texts, matrix):
+                    key = self.hash_text(text)
+                    existing = self._db.execute(
+                        "SELECT row FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                    ).fetchone()
+                    if existing:
+                        row = existing[0]
+                    else:
+                        free = self._db.execute(
+                            "SELECT rowid, row FROM free_rows WHERE namespace = ? LIMIT 1", (namespace,)
+                        ).fetchone()
+                        if free:
+                            self._db.execute("DELETE FROM free_rows WHERE rowid = ?", (free[0],))
+                            row = free[1]
+                        else:
+                            row = next_row
+                            next_row += 1
+                    f.seek(row * row_bytes)
+                    f.write(vector.astype(dtype).tobytes())
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (namespace, key, row, now)
+                    )
+
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        excess = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess <= 0:
+            return
+        stale = self._db.execute(
+            "SELECT namespace, key, row FROM entries ORDER BY last_used LIMIT ?", (excess,)
+        ).fetchall()
+        self._db.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", [(ns, key) for ns, key, _ in stale])
+        self._db.executemany("INSERT INTO free_rows VALUES (?, ?)", [(ns, row) for ns, _, row in stale])
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            for namespace, dtype in self._db.execute("SELECT namespace, dtype FROM namespaces").fetchall():
+                path = self._vector_path(namespace, dtype)
+                if os.path.exists(path):
+                    os.remove(path)
+            self._db.executescript("DELETE FROM entries; DELETE FROM free_rows; DELETE FROM namespaces;")
+            self._db.commit()
+
+
+class QueryEmbeddingCache:
+    """
+    An in-process LRU cache with TTL for query embeddings.
+
+    Keyed by (model name, normalized query text), so repeated chat questions and Level 2
+    topics skip the embedding call. Hit and miss counters are kept for measurement.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 3600):
+        """
+        :param max_entries: Maximum number of cached query embeddings.
+        :param ttl_seconds: Seconds after which a cached embedding is recomputed.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (model, normalized text) -> (embedding, stored_at)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def get_or_compute(self, model: str, text: str, compute: Callable[[str], List[float]]) -> List[float]:
+        """
+        Returns the cached embedding of text, computing and caching it on a miss.
+
+        :param model: Name of the embedding model.
+        :param text: The query text.
+        :param compute: Callable embedding the query text on a miss.
+        :return: The query embedding.
+        """
+        key = (model, self.normalize(text))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        embedding = compute(text)
+        if embedding is not None:
+            with self._lock:
+                self._entries[key] = (embedding, now)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return embedding
+
+    def get_or_compute_many(
+        self, model: str, texts: Sequence[str], compute_many: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        """
+        Batch variant of `get_or_compute`: all misses are embedded with one compute_many call.
+
+        :param model: Name of the embedding model.
+        :param texts: The query texts.
+        :param compute_many: Callable embedding a list of query texts.
+        :return: One embedding per text.
+        """
+        keys = [(model, self.normalize(text)) for text in texts]
+        now = time.monotonic()
+        embeddings = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[1] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    embeddings[i] = entry[0]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = compute_many([texts[i] for i in missing])
+            with self._lock:
+                for i, vector in zip(missing, vectors):
+                    embeddings[i] = vector
+                    self._entries[keys[i]] = (vector, now)
+                    self._entries.move_to_end(keys[i])
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return embeddings
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by every vector store in the process, so chat and Level 2 topics hit the same cache
+query_embedding_cache = QueryEmbeddingCache()
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import time
+import traceback
+import uuid
+from typing import Callable, Dict, Optional
+
+
+class IngestionJob:
+    """
+    State of a single background PDF ingestion job.
+    """
+
+    def __init__(self, file_name: str):
+        self.job_id = uuid.uuid4().hex
+        self.file_name = file_name
+        self.status = "queued"  # queued -> running -> completed | failed
+        self.collection_name: Optional[str] = None
+        self.pages_processed = 0
+        self.total_pages = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    def update_progress(self, pages_processed: int, total_pages: int) -> None:
+        """
+        Progress callback handed to the ingestion pipeline; safe to call from worker threads.
+        """
+        self.pages_processed = pages_processed
+        self.total_pages = total_pages
+        self.updated_at = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "file_name": self.file_name,
+            "status": self.status,
+            "collection_name": self.collection_name,
+            "pages_processed": self.pages_processed,
+            "total_pages": self.total_pages,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class IngestionJobManager:
+    """
+    Runs PDF ingestion as background asyncio tasks on the application's event loop.
+
+    Jobs are tracked in memory for the lifetime of the process, independently of the
+    HTTP request that submitted them. At most max_concurrency jobs ingest at a time;
+    the rest wait in the queue. Finished jobs are kept for retention_seconds.
+
+    Jobs are keyed by the content hash of their PDF while queued or running, so uploading
+    a PDF that is already being ingested returns the existing job instead of embedding
+    and writing the same collection twice.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, retention_seconds: int = 3600):
+        """
+        :param max_concurrency: Maximum number of concurrently running jobs. Defaults to
+                                the INGEST_MAX_CONCURRENCY environment variable, or 2.
+        :param retention_seconds: How long finished jobs remain queryable.
+        """
+        self.max_concurrency = max_concurrency or int(os.getenv("INGEST_MAX_CONCURRENCY", 2))
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[str, IngestionJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._in_flight: Dict[str, str] = {}  # Content hash -> ID of the queued or running job
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def submit(self, generator, pdf_path: str, content_hash: str, file_name: str) -> IngestionJob:
+        """
+        Queues ingestion of a PDF already spooled to disk and returns immediately.
+
+        Once it returns, the job owns pdf_path and removes it when ingestion finishes. If a
+        job for the same content hash is still queued or running, pdf_path is removed and
+        that job is returned instead.
+
+        :param generator: The AdvanceQuestionGeneratorClass instance that performs the ingestion.
+        :param pdf_path: Path of the spooled PDF file.
+        :param content_hash: SHA-256 of the PDF content.
+        :param file_name: Original name of the uploaded file.
+        :return: The queued job, or the job already ingesting this PDF.
+        """
+        self._prune()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        existing = self.jobs.get(self._in_flight.get(content_hash))
+        if existing is not None:
+            os.remove(pdf_path)
+            print(f"{file_name} is already being ingested by job {existing.job_id}.")
+            return existing
+
+        job = IngestionJob(file_name)
+        self.jobs[job.job_id] = job
+        self._in_flight[content_hash] = job.job_id
+        task = asyncio.create_task(self._run(job, generator, pdf_path, content_hash))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(job_id)
+
+    async def _run(self, job: IngestionJob, generator, pdf_path: str, content_hash: str) -> None:
+        async with self._semaphore:
+            job.status = "running"
+            job.updated_at = time.time()
+            try:
+                job.collection_name = await generator.ingest_spooled_pdf(
+                    pdf_path, content_hash, job.file_name, progress_callback=job.update_progress
+                )
+                job.status = "completed"
+            except Exception as e:
+                print(f"Ingestion job {job.job_id} failed: {e}")
+                traceback.print_exc()
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.updated_at = time.time()
+                if self._in_flight.get(content_hash) == job.job_id:
+                    del self._in_flight[content_hash]
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [
+            job_id for job_id, job in self.jobs.items()
+            if job.status in ("completed", "failed") and job.updated_at < cutoff
+        ]:
+            del self.jobs[job_id]
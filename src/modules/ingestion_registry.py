@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the in-process lock still serializes writers of one process
+    fcntl = None
+
+
+class IngestionRegistry:
+    """
+    A persistent content-hash -> collection registry stored next to the Chroma database.
+
+    Ingestion is keyed by the SHA-256 of the PDF bytes, so the same book uploaded under
+    another name maps to the same collection, and two different books sharing a filename
+    never collide.
+
+    Every change re-reads the file under an exclusive file lock and writes the merged
+    entries back, so instances in other threads or processes never lose each other's
+    entries. Reads pick up changes by others when the file's modification time changes.
+    One instance is shared per persist directory (see `shared`).
+    """
+
+    _instances: Dict[str, "IngestionRegistry"] = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, persist_directory: str = "./data/chroma_db", **kwargs) -> "IngestionRegistry":
+        """
+        Returns the process-wide registry for persist_directory, creating it on first use.
+        """
+        key = os.path.abspath(persist_directory)
+        with cls._instances_lock:
+            registry = cls._instances.get(key)
+            if registry is None:
+                registry = cls(persist_directory, **kwargs)
+                cls._instances[key] = registry
+            return registry
+
+    def __init__(self, persist_directory: str = "./data/chroma_db", file_name: str = "ingestion_registry.json"):
+        """
+        :param persist_directory: Directory where the Chroma database is persisted.
+        :param file_name: Name of the registry file inside persist_directory.
+        """
+        self.path = os.path.join(persist_directory, file_name)
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._entries: Dict[str, Dict[str, str]] = self._load()
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        """
+        Returns the hex SHA-256 digest used as the content key of a PDF.
+        """
+        return hashlib.sha256(data).hexdigest()
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        self._mtime = self._file_mtime()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error loading ingestion registry '{self.path}': {e}")
+            return {}
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=4)
+        os.replace(tmp_path, self.path)
+        self._mtime = self._file_mtime()
+
+    @contextmanager
+    def _update(self):
+        """
+        Holds the registry locks and re-reads the file, then saves the entries as left by the block.
+        """
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(f"{self.path}.lock", "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._entries = self._load()
+                    yield self._entries
+                    self._save()
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """
+        Re-reads the file if another instance changed it. Called with self._lock held.
+        """
+        if self._file_mtime() != self._mtime:
+            self._entries = self._load()
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """
+        Returns the collection name registered for a content hash, if any.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(content_hash)
+        return entry["collection_name"] if entry else None
+
+    def is_collection_taken(self, collection_name: str, content_hash: str) -> bool:
+        """
+        Returns True if collection_name is already registered for a different content hash.
+        """
+        with self._lock:
+            self._refresh()
+            return any(
+                entry["collection_name"] == collection_name and key != content_hash
+                for key, entry in self._entries.items()
+            )
+
+    def register(self, content_hash: str, collection_name: str, file_name: str) -> None:
+        """
+        Records that the PDF with content_hash has been ingested into collection_name.
+        """
+        with self._update() as entries:
+            entries[content_hash] = {"collection_name": collection_name, "file_name": file_name}
+
+    def remove(self, content_hash: str) -> None:
+        with self._update() as entries:
+            entries.pop(content_hash, None)
+
+    def remove_collection(self, collection_name: str) -> List[str]:
+        """
+        Removes every content hash registered for collection_name and returns them.
+        """
+        with self._update() as entries:
+            content_hashes = [
+                key for key, entry in entries.items() if entry["collection_name"] == collection_name
+            ]
+            for content_hash in content_hashes:
+                del entries[content_hash]
+        return content_hashes
+
+    def reload(self) -> None:
+        """
+        Re-reads the registry file, picking up changes made by other instances.
+        """
+        with self._lock:
+            self._entries = self._load()
+
+    def clear(self) -> None:
+        with self._update() as entries:
+            entries.clear()
@@ -0,0 +1,139 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Tuple
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Function words that carry no topical signal and would only inflate the postings.
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can do for from has have how if in into is it its "
+    "may not of on or so such than that the their then there these they this to was were "
+    "what when which who will with would you your".split()
+)
+
+
+class LexicalIndex:
+    """
+    A BM25 inverted index over the chunks of one collection, persisted as a JSON file.
+
+    Lexical retrieval needs no embedding, so short keyword-style queries can be answered
+    without a model call. Documents are only ever added, mirroring the vector store.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        """
+        :param path: JSON file the index is loaded from and saved to.
+        :param k1: BM25 term-frequency saturation.
+        :param b: BM25 document-length normalization.
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self.ids: List[str] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._id_set = set()
+        self._load()
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """
+        Returns the lowercased words of text without stopwords.
+        """
+        return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._id_set
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error loading lexical index '{self.path}': {e}")
+            return
+        self.ids = data["ids"]
+        self.lengths = data["lengths"]
+        self.postings = {
+            term: {int(doc): tf for doc, tf in entries} for term, entries in data["postings"].items()
+        }
+        self._id_set = set(self.ids)
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "ids": self.ids,
+                "lengths": self.lengths,
+                "postings": {term: list(entries.items()) for term, entries in self.postings.items()},
+            }
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+    def add(self, ids: List[str], texts: List[str]) -> None:
+        """
+        Indexes texts under ids, skipping ids that are already indexed.
+        """
+        with self._lock:
+            for id_, text in zip(ids, texts):
+                if id_ in self._id_set:
+                    continue
+                doc = len(self.ids)
+                tokens = self.tokenize(text)
+                self.ids.append(id_)
+                self.lengths.append(len(tokens))
+                self._id_set.add(id_)
+                for term, tf in Counter(tokens).items():
+                    self.postings.setdefault(term, {})[doc] = tf
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Returns up to top_k (id, BM25 score) pairs for query, best first. Documents that
+        share no term with the query are not returned.
+        """
+        with self._lock:
+            count = len(self.ids)
+            if not count:
+                return []
+            average_length = sum(self.lengths) / count
+            scores: Dict[int, float] = {}
+            for term in set(self.tokenize(query)):
+                entries = self.postings.get(term)
+                if not entries:
+                    continue
+                idf = math.log(1 + (count - len(entries) + 0.5) / (len(entries) + 0.5))
+                for doc, tf in entries.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[doc] / average_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+            return [(self.ids[doc], score) for doc, score in best]
+
+
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """
+    Fuses several rankings of ids into one, scoring each id by the sum of 1 / (k + rank).
+
+    :param rankings: Ranked id lists, best first.
+    :param k: Damping constant; 60 is the usual choice.
+    :return: (id, fused score) pairs, best first.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, id_ in enumerate(ranking, start=1):
+            scores[id_] = scores.get(id_, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
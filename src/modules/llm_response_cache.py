@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Type
+
+from pydantic import BaseModel
+
+# Call sites whose responses are cached unless LLM_CACHE_CALL_SITES says otherwise. Book
+# titles and topics are deterministic enough to reuse; question generation and chat are opt-in.
+DEFAULT_CALL_SITES = "generate_book_title"
+
+
+class LLMResponseCache:
+    """
+    A persistent cache of structured LLM responses in SQLite.
+
+    Entries are keyed by (model name, temperature, output schema, SHA-256 of the prompt),
+    so a changed prompt template, model or schema never returns a stale answer. Entries
+    expire after ttl_seconds, and the least recently used ones are evicted once the cache
+    holds more than max_entries responses or max_bytes of response text.
+
+    Caching is enabled per call site (e.g. 'generate_book_title'), and hits and misses
+    are counted per call site.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, directory: str = "./data/llm_cache", **kwargs) -> "LLMResponseCache":
+        """
+        Returns the process-wide cache for a directory, creating it on first use.
+        """
+        directory = os.path.abspath(directory)
+        with cls._shared_lock:
+            if directory not in cls._shared:
+                cls._shared[directory] = cls(directory, **kwargs)
+            return cls._shared[directory]
+
+    def __init__(
+        self,
+        directory: str = "./data/llm_cache",
+        call_sites: Optional[Iterable[str]] = None,
+        ttl_seconds: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", "604800")),
+        max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+        max_bytes: int = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    ):
+        """
+        :param directory: Directory holding the SQLite database.
+        :param call_sites: Call sites to cache. Defaults to the comma-separated LLM_CACHE_CALL_SITES
+            environment variable, or 'generate_book_title'. An empty value disables the cache.
+        :param ttl_seconds: Age after which a response is no longer used. 0 keeps responses until evicted.
+        :param max_entries: Maximum number of cached responses.
+        :param max_bytes: Maximum total size of the cached responses.
+        """
+        if call_sites is None:
+            call_sites = os.getenv("LLM_CACHE_CALL_SITES", DEFAULT_CALL_SITES).split(",")
+        self.call_sites = {site.strip() for site in call_sites if site.strip()}
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._schema_hashes: Dict[type, str] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, "responses.sqlite3"), check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, call_site TEXT NOT NULL, response TEXT NOT NULL,
+                size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+            """
+        )
+        self._db.commit()
+
+    def enabled(self, call_site: str) -> bool:
+        return call_site in self.call_sites
+
+    def _schema_hash(self, model_class: Type[BaseModel]) -> str:
+        schema_hash = self._schema_hashes.get(model_class)
+        if schema_hash is None:
+            schema = json.dumps(model_class.model_json_schema(), sort_keys=True)
+            schema_hash = hashlib.sha256(schema.encode("utf-8")).hexdigest()
+            self._schema_hashes[model_class] = schema_hash
+        return schema_hash
+
+    def _key(self, model_name: str, temperature: float, model_class: Type[BaseModel], prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        parts = [model_name, repr(float(temperature)), self._schema_hash(model_class), prompt_hash]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get(
+        self, call_site: str, model_name: str, temperature: float, model_class: Type[BaseModel], prompt: str
+    ) -> Optional[BaseModel]:
+        """
+        Returns the cached response for the prompt as a model_class instance, or None on a
+        miss (or if caching is disabled for the call site).
+        """
+        if not self.enabled(call_site):
+            return None
+        key = self._key(model_name, temperature, model_class, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self._misses[call_site] = self._misses.get(call_site, 0) + 1
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self._hits[call_site] = self._hits.get(call_site, 0) + 1
+        return model_class.model_validate_json(row[0])
+
+    def put(
+        self, call_site: str, model_name: str, temperature: float, model_class: Type[BaseModel], prompt: str, response
+    ) -> None:
+        """
+        Caches a response, given as a model_class instance or its JSON string. Responses
+        that do not validate against model_class are not cached.
+        """
+        if not self.enabled(call_site):
+            return
+        try:
+            if isinstance(response, str):
+                response = model_class.model_validate_json(response)
+            if not isinstance(response, model_class):
+                return
+            payload = response.model_dump_json()
+        except Exception as e:
+            print(f"Not caching invalid '{call_site}' response: {e}")
+            return
+
+        key = self._key(model_name, temperature, model_class, prompt)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, call_site, response, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, call_site, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        if self.ttl_seconds:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+        count, total_bytes = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+        # Drop least recently used responses until both limits hold
+        to_delete = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            count -= 1
+            total_bytes -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._hits = {}
+            self._misses = {}
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Returns the cache size and the hits, misses and hit rate per call site.
+        """
+        with self._lock:
+            count, total_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            call_sites = {}
+            for call_site in sorted(self.call_sites | self._hits.keys() | self._misses.keys()):
+                hits = self._hits.get(call_site, 0)
+                misses = self._misses.get(call_site, 0)
+                call_sites[call_site] = {
+                    "enabled": self.enabled(call_site),
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                }
+        return {"entries": count, "bytes": total_bytes, "call_sites": call_sites}
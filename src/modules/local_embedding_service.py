@@ -0,0 +1,133 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+
+class _EmbedRequest:
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future = Future()
+
+
+class LocalEmbeddingService:
+    """
+    A process-wide, thread-safe wrapper around one SentenceTransformer model.
+
+    Small encode requests from concurrent callers (e.g. chat queries running in separate
+    `asyncio.to_thread` workers) are gathered into micro-batches and run as a single
+    `encode` call. Everything queued while the previous batch was encoding joins the next
+    one; a lone request is encoded at once, and only while other requests keep arriving
+    does a batch wait for more, up to max_wait_ms or max_batch_size texts. Requests at
+    least max_batch_size long are encoded directly. Only one encode runs at a time, and
+    only one copy of each model is loaded per process.
+
+    Exposes the subset of the SentenceTransformer `encode` interface used by the vector store.
+    """
+
+    _shared: Dict[str, "LocalEmbeddingService"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, model_name: str, **kwargs) -> "LocalEmbeddingService":
+        """
+        Returns the process-wide service for model_name, loading the model on first use.
+        """
+        with cls._shared_lock:
+            if model_name not in cls._shared:
+                cls._shared[model_name] = cls(model_name, **kwargs)
+            return cls._shared[model_name]
+
+    def __init__(self, model_name: str, max_batch_size: int = 64, max_wait_ms: float = 2):
+        """
+        :param model_name: The Hugging Face embedding model to load.
+        :param max_batch_size: Maximum number of texts encoded in one micro-batch.
+        :param max_wait_ms: How long a batch of concurrent requests waits for more to join it.
+        """
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.requests = 0
+        self.batches = 0
+        self._stats_lock = threading.Lock()
+        self._queue: "queue.Queue[_EmbedRequest]" = queue.Queue()
+        self._encode_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"embed-{self.model_name}", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            count = len(batch[0].texts)
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while count < self.max_batch_size:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    # Wait for more only while other requests are arriving, never for a lone one
+                    remaining = deadline - time.monotonic()
+                    if len(batch) == 1 or remaining <= 0:
+                        break
+                    try:
+                        request = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                batch.append(request)
+                count += len(request.texts)
+
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = self._encode(texts)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            start = 0
+            for request in batch:
+                request.future.set_result(vectors[start:start + len(request.texts)])
+                start += len(request.texts)
+
+    def _encode(self, texts: List[str], batch_size: Optional[int] = None):
+        with self._encode_lock:
+            with self._stats_lock:
+                self.batches += 1
+            return self.model.encode(texts, batch_size=batch_size or self.max_batch_size, convert_to_numpy=True)
+
+    def encode(self, sentences, batch_size: Optional[int] = None, convert_to_numpy: bool = True):
+        """
+        Encodes one text or a list of texts, like `SentenceTransformer.encode`.
+
+        :param sentences: A string or a list of strings.
+        :param batch_size: Forward-pass batch size for requests encoded directly.
+        :param convert_to_numpy: Kept for interface compatibility; results are NumPy arrays.
+        :return: One vector for a string, or a 2-D array for a list.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        with self._stats_lock:
+            self.requests += 1
+
+        if len(texts) >= self.max_batch_size:
+            vectors = self._encode(texts, batch_size)
+        else:
+            self._ensure_worker()
+            request = _EmbedRequest(texts)
+            self._queue.put(request)
+            vectors = request.future.result()
+
+        return vectors[0] if single else vectors
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {"requests": self.requests, "batches": self.batches}
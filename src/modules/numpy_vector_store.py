@@ -0,0 +1,488 @@
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from .embedding_cache import EmbeddingCache
+from .vector_store_base import BaseVectorStore
+
+
+PRECISIONS = ("float32", "float16", "int8")
+
+
+class _NumpyCollection:
+    """
+    One collection on disk: a directory with
+
+    - embeddings.f32: L2-normalized float32 rows, appended in insertion order and read through a memmap,
+    - embeddings.f16 / embeddings.i8 (+ scales.f32): the same rows at reduced precision, if the
+      collection was created with precision 'float16' or 'int8',
+    - records.jsonl: one {"id", "document", "metadata"} line per row, in the same order,
+    - meta.json: the dimension, the committed row count, the precision, the ingest progress
+      and the content hash of the ingested document.
+
+    Reduced-precision collections scan the small matrix and only read the float32 rows of
+    the top candidates, for rescoring; without rescoring the float32 file is not written.
+
+    meta.json is written last (atomically) after every append, so rows beyond its count
+    are leftovers of an interrupted write and are ignored (and overwritten) on load.
+    """
+
+    def __init__(self, directory: str, precision: str = "float32", full_precision: bool = True):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.meta = self._read_meta(precision, full_precision)
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[dict] = []
+        self._positions: Dict[str, int] = {}
+        self._matrices = {}
+        self._load_records()
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def precision(self) -> str:
+        return self.meta["precision"]
+
+    @property
+    def full_precision(self) -> bool:
+        return self.meta["full_precision"]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self, precision: str, full_precision: bool) -> dict:
+        try:
+            with open(self._path("meta.json"), "r") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = {"dim": 0, "count": 0, "pages_committed": 0, "pages_total": 0}
+        # The precision is fixed when the collection is created
+        meta.setdefault("precision", precision)
+        meta.setdefault("full_precision", full_precision or precision == "float32")
+        return meta
+
+    def _write_meta(self) -> None:
+        temp_path = self._path("meta.json.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(temp_path, self._path("meta.json"))
+
+    def _load_records(self) -> None:
+        try:
+            with open(self._path("records.jsonl"), "r") as f:
+                for line in f:
+                    if len(self.ids) >= self.count:
+                        break
+                    record = json.loads(line)
+                    self.ids.append(record["id"])
+                    self.documents.append(record["document"])
+                    self.metadatas.append(record["metadata"])
+        except FileNotFoundError:
+            pass
+        self._positions = {id_: i for i, id_ in enumerate(self.ids)}
+
+    def _files(self) -> Dict[str, tuple]:
+        """
+        Returns the matrix files of the collection as {file name: (dtype, columns)}.
+        """
+        files = {}
+        if self.full_precision:
+            files["embeddings.f32"] = ("float32", self.meta["dim"])
+        if self.precision == "float16":
+            files["embeddings.f16"] = ("float16", self.meta["dim"])
+        elif self.precision == "int8":
+            files["embeddings.i8"] = ("int8", self.meta["dim"])
+            files["scales.f32"] = ("float32", 1)
+        return files
+
+    def _memmap(self, name: str):
+        import numpy as np
+
+        dtype, columns = self._files()[name]
+        matrix = self._matrices.get(name)
+        if matrix is None or matrix.shape[0] != self.count:
+            matrix = np.memmap(self._path(name), dtype=dtype, mode="r", shape=(self.count, columns))
+            self._matrices[name] = matrix
+        return matrix
+
+    def matrix(self):
+        """
+        Returns the committed embeddings as a read-only (count, dim) memmap at the stored
+        precision, together with the per-row int8 scales (None otherwise), or (None, None) if empty.
+        """
+        if self.count == 0:
+            return None, None
+        if self.precision == "float16":
+            return self._memmap("embeddings.f16"), None
+        if self.precision == "int8":
+            return self._memmap("embeddings.i8"), self._memmap("scales.f32")[:, 0]
+        return self._memmap("embeddings.f32"), None
+
+    def full_rows(self, rows):
+        """
+        Returns the float32 embeddings of the given rows, or None if they are not stored.
+        """
+        if not self.full_precision or self.count == 0:
+            return None
+        return self._memmap("embeddings.f32")[rows]
+
+    def existing_ids(self, ids: List[str]) -> List[str]:
+        return [id_ for id_ in ids if id_ in self._positions]
+
+    def export(self):
+        """
+        Returns the committed ids, documents, metadatas and float32 embeddings; int8 and
+        float16 rows are dequantized when no float32 rows are stored.
+        """
+        import numpy as np
+
+        with self.lock:
+            count = self.count
+            ids, documents, metadatas = self.ids[:count], self.documents[:count], self.metadatas[:count]
+            if count == 0:
+                return ids, documents, metadatas, np.zeros((0, self.meta["dim"]), dtype=np.float32)
+            if self.full_precision:
+                return ids, documents, metadatas, np.array(self._memmap("embeddings.f32"))
+            matrix, scales = self.matrix()
+            embeddings = np.asarray(matrix, dtype=np.float32)
+            if scales is not None:
+                embeddings = embeddings * scales[:, None]
+            return ids, documents, metadatas, embeddings
+
+    def embeddings(self, ids: List[str]):
+        """
+        Returns the embeddings of ids, at full precision when float32 rows are stored.
+        """
+        import numpy as np
+
+        positions = np.array([self._positions[id_] for id_ in ids])
+        rows = self.full_rows(positions)
+        if rows is not None:
+            return np.asarray(rows)
+        matrix, scales = self.matrix()
+        rows = np.asarray(matrix[positions], dtype=np.float32)
+        return rows * scales[positions][:, None] if scales is not None else rows
+
+    def records(self, ids: List[str]) -> Tuple[List[str], List[dict]]:
+        positions = [self._positions[id_] for id_ in ids]
+        return [self.documents[i] for i in positions], [self.metadatas[i] for i in positions]
+
+    def add(self, ids: List[str], texts: List[str], embeddings: List[List[float]], metadatas: List[dict]) -> None:
+        import numpy as np
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError("Embeddings must be a list of equal-length vectors.")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        arrays = {}
+        if self.full_precision:
+            arrays["embeddings.f32"] = vectors
+        if self.precision == "float16":
+            arrays["embeddings.f16"] = vectors.astype(np.float16)
+        elif self.precision == "int8":
+            # Symmetric scalar quantization with one scale per vector
+            scales = np.abs(vectors).max(axis=1, keepdims=True) / 127
+            scales[scales == 0] = 1
+            arrays["embeddings.i8"] = np.round(vectors / scales).astype(np.int8)
+            arrays["scales.f32"] = scales.astype(np.float32)
+
+        with self.lock:
+            # Ids already stored (e.g. by a concurrent ingest of the same document) are skipped
+            new_rows = [i for i, id_ in enumerate(ids) if id_ not in self._positions]
+            if len(new_rows) < len(ids):
+                if not new_rows:
+                    return
+                ids = [ids[i] for i in new_rows]
+                texts = [texts[i] for i in new_rows]
+                metadatas = [metadatas[i] for i in new_rows]
+                arrays = {name: array[new_rows] for name, array in arrays.items()}
+                vectors = vectors[new_rows]
+            if self.meta["dim"] and vectors.shape[1] != self.meta["dim"]:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match the collection's {self.meta['dim']}."
+                )
+            # Truncate leftovers of an interrupted append before writing at the committed end
+            for name, array in arrays.items():
+                row_bytes = array.shape[1] * array.itemsize
+                with open(self._path(name), "ab") as f:
+                    f.truncate(self.count * row_bytes)
+                    f.write(array.tobytes())
+            with open(self._path("records.jsonl"), "a") as f:
+                f.truncate(self._records_size())
+                for id_, text, metadata in zip(ids, texts, metadatas):
+                    f.write(json.dumps({"id": id_, "document": text, "metadata": metadata}) + "\n")
+                self.meta["records_size"] = f.tell()
+
+            self.meta["dim"] = vectors.shape[1]
+            self.meta["count"] += len(ids)
+            self._write_meta()
+
+            self._positions.update((id_, len(self.ids) + i) for i, id_ in enumerate(ids))
+            self.ids.extend(ids)
+            self.documents.extend(texts)
+            self.metadatas.extend(metadatas)
+            self._matrices = {}
+
+    def _records_size(self) -> int:
+        return self.meta.get("records_size", 0)
+
+    def update_progress(self, pages_committed: int, pages_total: int, content_hash: Optional[str] = None) -> None:
+        with self.lock:
+            self.meta.update({"pages_committed": pages_committed, "pages_total": pages_total})
+            if content_hash:
+                self.meta["content_hash"] = content_hash
+            self._write_meta()
+
+
+class NumpyVectorStore(BaseVectorStore):
+    """
+    An in-process vector store that keeps each collection as a memory-mapped matrix of
+    normalized embeddings and answers top-k queries with one vectorized dot product.
+
+    It has no server, index build or background threads, which suits single-process
+    deployments with collections of up to a few hundred thousand chunks.
+    """
+
+    vector_store = "NumPy"
+
+    def __init__(
+        self,
+        openai_api_key: Optional[str] = os.getenv("GEMINI_API_KEY"),
+        persist_directory: str = "./data/numpy_store",
+        model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        chunk_size: int = 200,
+        chunk_overlap: int = 32,
+        embedding_batch_size: int = 64,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        use_embedding_cache: bool = True,
+        precision: str = os.getenv("VECTOR_STORE_PRECISION", "float32"),
+        rescore_factor: int = int(os.getenv("VECTOR_STORE_RESCORE_FACTOR", "0")),
+    ):
+        """
+        Initializes the NumpyVectorStore with the provided configurations.
+
+        :param openai_api_key: Your Gemini API key. Without one, the local Hugging Face model is used.
+        :param persist_directory: Directory holding one subdirectory per collection.
+        :param model: The Hugging Face embedding model to use without an API key.
+        :param chunk_size: Maximum number of tokens per stored chunk.
+        :param chunk_overlap: Number of tokens shared by consecutive chunks of a page.
+        :param embedding_batch_size: Number of texts encoded per forward pass of the local model.
+        :param embedding_cache: Embedding cache to use. Defaults to the shared cache stored next to persist_directory.
+        :param use_embedding_cache: Set to False to always compute document embeddings.
+        :param precision: Storage precision of new collections: 'float32', 'float16' or 'int8'
+            (scalar quantization with one scale per vector). Existing collections keep theirs.
+        :param rescore_factor: For reduced precision, also store the float32 rows and rescore the
+            top rescore_factor * top_k candidates with them. Off (0) by default, since the float32
+            rows make a reduced-precision collection larger on disk than a float32 one.
+        :raises ValueError: If the precision is unknown.
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}'. Use one of {', '.join(PRECISIONS)}.")
+        super().__init__(
+            openai_api_key=openai_api_key,
+            persist_directory=persist_directory,
+            model=model,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            embedding_batch_size=embedding_batch_size,
+            embedding_cache=embedding_cache,
+            use_embedding_cache=use_embedding_cache,
+        )
+        self.precision = precision
+        self.rescore_factor = rescore_factor
+        os.makedirs(persist_directory, exist_ok=True)
+        self._collections: Dict[str, _NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+    def _collection_dir(self, collection_name: str) -> str:
+        return os.path.join(self.persist_directory, collection_name)
+
+    def get_collection(self, collection_name: str) -> _NumpyCollection:
+        """
+        Returns an existing collection, loading its records on first use.
+
+        :param collection_name: The name of the collection to retrieve.
+        :return: The collection.
+        :raises ValueError: If the collection does not exist.
+        """
+        with self._lock:
+            collection = self._collections.get(collection_name)
+            if collection is not None:
+                return collection
+            directory = self._collection_dir(collection_name)
+            if not os.path.isfile(os.path.join(directory, "meta.json")):
+                raise ValueError(f"Collection '{collection_name}' does not exist.")
+            collection = _NumpyCollection(directory)
+            self._collections[collection_name] = collection
+            return collection
+
+    def collection_exists(self, collection_name: str) -> bool:
+        try:
+            self.get_collection(collection_name)
+            return True
+        except ValueError:
+            return False
+
+    def get_all_text(self, collection_name: str) -> List[str]:
+        collection = self.get_collection(collection_name)
+        return self.chunker.merge_chunks(list(collection.documents), list(collection.metadatas))
+
+    def get_ingest_progress(self, collection_name: str) -> Dict[str, Any]:
+        try:
+            meta = self.get_collection(collection_name).meta
+        except ValueError:
+            meta = {}
+        return {
+            "pages_committed": meta.get("pages_committed", 0),
+            "pages_total": meta.get("pages_total", 0),
+            "content_hash": meta.get("content_hash"),
+        }
+
+    def _get_embeddings(self, collection_name: str, ids: List[str]):
+        collection = self.get_collection(collection_name)
+        with collection.lock:
+            return collection.embeddings(ids)
+
+    def _export_records(self, collection_name: str):
+        return self.get_collection(collection_name).export()
+
+    def forget_collection(self, collection_name: str) -> None:
+        super().forget_collection(collection_name)
+        with self._lock:
+            self._collections.pop(collection_name, None)
+
+    def delete_collection(self, collection_name: str) -> None:
+        """
+        Deletes one collection and its lexical index; the other collections stay loaded.
+
+        :param collection_name: The name of the collection to delete.
+        :raises ValueError: If the collection does not exist.
+        """
+        self.get_collection(collection_name)
+        self.forget_collection(collection_name)
+        shutil.rmtree(self._collection_dir(collection_name), ignore_errors=True)
+        self._delete_lexical_index(collection_name)
+        print(f"Deleted collection: '{collection_name}'")
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Truncates rows and records left beyond the committed count by interrupted appends,
+        and removes temporary files and collection directories that never got a meta.json.
+
+        :return: A dictionary with 'bytes_before' and 'bytes_after'.
+        """
+        import numpy as np
+
+        bytes_before = self.disk_usage()
+        for name in os.listdir(self.persist_directory):
+            directory = self._collection_dir(name)
+            if not os.path.isdir(directory) or name == "lexical_index":
+                continue
+            if not os.path.isfile(os.path.join(directory, "meta.json")):
+                shutil.rmtree(directory, ignore_errors=True)
+                continue
+            collection = self.get_collection(name)
+            with collection.lock:
+                for file_name, (dtype, columns) in collection._files().items():
+                    row_bytes = columns * np.dtype(dtype).itemsize
+                    with open(collection._path(file_name), "ab") as f:
+                        f.truncate(collection.count * row_bytes)
+                with open(collection._path("records.jsonl"), "ab") as f:
+                    f.truncate(collection._records_size())
+                if os.path.exists(collection._path("meta.json.tmp")):
+                    os.remove(collection._path("meta.json.tmp"))
+                collection._matrices = {}
+        bytes_after = self.disk_usage()
+        print(f"Compacted '{self.persist_directory}': {bytes_before} -> {bytes_after} bytes.")
+        return {"bytes_before": bytes_before, "bytes_after": bytes_after}
+
+    def reset_client(self):
+        with self._lock:
+            self._collections = {}
+            self._reset_lexical_indexes()
+            shutil.rmtree(self.persist_directory, ignore_errors=True)
+            os.makedirs(self.persist_directory, exist_ok=True)
+        return True
+
+    def _prepare_collection(self, collection_name: str, content_hash: Optional[str] = None) -> None:
+        if self.collection_exists(collection_name):
+            return
+        directory = self._collection_dir(collection_name)
+        os.makedirs(directory, exist_ok=True)
+        collection = _NumpyCollection(directory, self.precision, full_precision=self.rescore_factor > 0)
+        collection.update_progress(0, 0, content_hash)
+        with self._lock:
+            self._collections[collection_name] = collection
+        print(f"Created new collection: '{collection_name}'")
+
+    def _existing_ids(self, collection_name: str, ids: List[str]) -> List[str]:
+        return self.get_collection(collection_name).existing_ids(ids)
+
+    def _all_records(self, collection_name: str) -> Tuple[List[str], List[str]]:
+        collection = self.get_collection(collection_name)
+        return list(collection.ids), list(collection.documents)
+
+    def _get_records(self, collection_name: str, ids: List[str]) -> Tuple[List[str], List[dict]]:
+        return self.get_collection(collection_name).records(ids)
+
+    def _add(self, collection_name: str, ids: List[str], texts: List[str], embeddings: List[List[float]], metadatas: List[dict]) -> None:
+        self.get_collection(collection_name).add(ids, texts, embeddings, metadatas)
+
+    def _update_ingest_progress(self, collection_name: str, pages_committed: int, pages_total: int) -> None:
+        try:
+            self.get_collection(collection_name).update_progress(pages_committed, pages_total)
+        except Exception as e:
+            print(f"Error updating ingest progress of collection '{collection_name}': {e}")
+
+    def _query(self, collection_name: str, query_embeddings: List[List[float]], top_k: int) -> Dict[str, list]:
+        """
+        Scores every query against every row with one matrix product and keeps the top_k.
+
+        Reduced-precision collections score the quantized rows first and, if float32 rows
+        are stored, rescore the best rescore_factor * top_k candidates at full precision.
+        Distances are cosine distances (1 - cosine similarity), matching the confidence
+        computed by `_format_results`.
+        """
+        import numpy as np
+
+        collection = self.get_collection(collection_name)
+        with collection.lock:
+            matrix, scales = collection.matrix()
+            ids, documents, metadatas = collection.ids, collection.documents, collection.metadatas
+
+        results = {key: [] for key in ("ids", "documents", "metadatas", "distances")}
+        if matrix is None:
+            for key in results:
+                results[key] = [[] for _ in query_embeddings]
+            return results
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+
+        scores = queries @ matrix.T.astype(np.float32, copy=False)
+        if scales is not None:
+            scores *= scales
+        rescore = collection.precision != "float32" and collection.full_precision and self.rescore_factor > 0
+        k = min(top_k, scores.shape[1])
+        candidates_k = min(k * self.rescore_factor, scores.shape[1]) if rescore else k
+        top = np.argpartition(-scores, candidates_k - 1, axis=1)[:, :candidates_k]
+        for row, candidates in enumerate(top):
+            if rescore:
+                candidates = np.sort(candidates)  # Sequential reads from the memmap
+                candidate_scores = collection.full_rows(candidates) @ queries[row]
+            else:
+                candidate_scores = scores[row, candidates]
+            best = np.argsort(-candidate_scores)[:k]
+            order = candidates[best]
+            results["ids"].append([ids[i] for i in order])
+            results["documents"].append([documents[i] for i in order])
+            results["metadatas"].append([metadatas[i] for i in order])
+            results["distances"].append([float(1.0 - candidate_scores[i]) for i in best])
+        return results
@@ -1,15 +1,285 @@
-import fitz  # PyMuPDF
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .boilerplate_stripper import BoilerplateStripper
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool():
+    """
+    Returns the process-wide pool of page extraction workers, creating it on first use.
+
+    Workers are started with 'spawn', since forking the multithreaded server process can
+    deadlock the children on locks held by other threads. The pool is shared by every
+    PDFtoText instance and ingestion job, so at most PDF_EXTRACT_WORKERS (default: the
+    number of CPUs) extraction processes exist at a time.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            import multiprocessing
+
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=int(os.getenv("PDF_EXTRACT_WORKERS", os.cpu_count() or 1)),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _extraction_pool
+
+
+def _discard_extraction_pool(pool):
+    """
+    Drops a broken pool (e.g. after a worker was killed) so the next call starts a new one.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    pool.shutdown(wait=False)
+
+
+def _page_content(page, as_blocks=False):
+    """
+    Returns the text of a page, or its height and text blocks as (y0, y1, text) tuples.
+    """
+    if not as_blocks:
+        return page.get_text()
+    # Block tuples are (x0, y0, x1, y1, text, block_no, block_type); type 0 is text
+    blocks = [(block[1], block[3], block[4]) for block in page.get_text("blocks") if block[6] == 0]
+    return page.rect.height, blocks
+
+
+def _extract_page_shard(pdf_path, start_page, end_page, as_blocks=False):
+    """
+    Extracts the content of pages [start_page, end_page) from a PDF on disk.
+
+    Runs inside a worker process, so every worker opens the shared file itself
+    instead of receiving a pickled copy of the document bytes.
+
+    Args:
+        pdf_path: Path of the PDF file shared by all workers.
+        start_page: First page of the shard (0-based, inclusive).
+        end_page: Last page of the shard (0-based, exclusive).
+        as_blocks: Return positioned text blocks instead of plain text.
+
+    Returns:
+        list: (page number, page content) tuples with 1-based page numbers.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        return [
+            (str(page_number + 1), _page_content(doc[page_number], as_blocks))
+            for page_number in range(start_page, end_page)
+        ]
+
+
+class DocumentCache:
+    """
+    A bounded LRU cache of open PyMuPDF documents with a per-page text memo.
+
+    Documents are keyed by content hash, so repeated page lookups on the same book
+    reuse one parsed handle instead of reopening the stream. Handles are evicted when
+    the cache exceeds max_documents or when they have been idle for max_idle_seconds.
+    """
+
+    def __init__(self, max_documents=8, max_idle_seconds=600, max_memo_pages=2048):
+        """
+        Args:
+            max_documents: Maximum number of open documents kept in the cache.
+            max_idle_seconds: Documents unused for longer than this are closed.
+            max_memo_pages: Maximum number of page texts memoized across documents.
+        """
+        self.max_documents = max_documents
+        self.max_idle_seconds = max_idle_seconds
+        self.max_memo_pages = max_memo_pages
+        self._docs = OrderedDict()  # key -> (doc, last_used)
+        self._page_memo = OrderedDict()  # (key, page_index) -> text
+        # PyMuPDF documents are not thread-safe, so all access goes through one lock
+        self._lock = threading.RLock()
+
+    def _evict(self, now):
+        while self._docs:
+            key, (doc, last_used) = next(iter(self._docs.items()))
+            if len(self._docs) <= self.max_documents and now - last_used <= self.max_idle_seconds:
+                break
+            self._close(key)
+
+    def _close(self, key):
+        doc, _ = self._docs.pop(key)
+        doc.close()
+        for memo_key in [memo_key for memo_key in self._page_memo if memo_key[0] == key]:
+            del self._page_memo[memo_key]
+
+    def get(self, key, opener):
+        """
+        Returns the cached document for key, opening it with opener() on a miss.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if key in self._docs:
+                doc, _ = self._docs.pop(key)
+            else:
+                doc = opener()
+            self._docs[key] = (doc, now)
+            self._evict(now)
+            return doc
+
+    def page_count(self, key, opener):
+        with self._lock:
+            return self.get(key, opener).page_count
+
+    def page_text(self, key, opener, page_index):
+        """
+        Returns the text of a page (0-based), memoized per document.
+        """
+        with self._lock:
+            memo_key = (key, page_index)
+            if memo_key in self._page_memo:
+                self._page_memo.move_to_end(memo_key)
+                self.get(key, opener)  # Refresh the document's idle timer
+                return self._page_memo[memo_key]
+            text = self.get(key, opener)[page_index].get_text()
+            self._page_memo[memo_key] = text
+            while len(self._page_memo) > self.max_memo_pages:
+                self._page_memo.popitem(last=False)
+            return text
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._docs):
+                self._close(key)
+
 
 class PDFtoText:
-    def __init__(self):
-        pass
+    def __init__(self, workers=None, parallel_min_pages=64, doc_cache=None, strip_boilerplate=True, stripper=None):
+        """
+        Args:
+            workers: Number of shards a large document is split into for parallel
+                     extraction. Defaults to the number of CPUs; the shards run on
+                     the shared worker pool (see `get_extraction_pool`).
+            parallel_min_pages: Documents with fewer pages are always extracted serially.
+            doc_cache: DocumentCache used for single page and interval lookups.
+            strip_boilerplate: Remove repeated headers, footers and page numbers in
+                               `extract_pages_and_text`.
+            stripper: BoilerplateStripper used when strip_boilerplate is enabled.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_min_pages = parallel_min_pages
+        self.doc_cache = doc_cache or DocumentCache()
+        self.strip_boilerplate = strip_boilerplate
+        self.stripper = stripper or BoilerplateStripper()
+        # id(pdf) -> (pdf, length, key) for recently hashed bytes and file-like objects;
+        # holding pdf keeps its id from being reused by another object
+        self._key_memo = OrderedDict()
+        self._key_memo_lock = threading.Lock()
+
+    def _cache_key(self, pdf, content_hash=None):
+        """
+        Returns the document cache key for a PDF.
+
+        Bytes and file-like objects are keyed by the SHA-256 of their content, hashed once
+        per object and length; paths are keyed by their location, size and modification
+        time to avoid reading the file.
+        """
+        if content_hash:
+            return content_hash
+        if isinstance(pdf, (str, os.PathLike)):
+            stat = os.stat(pdf)
+            return f"{os.path.abspath(pdf)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+        length = self._input_length(pdf)
+        with self._key_memo_lock:
+            memo = self._key_memo.get(id(pdf))
+            if memo is not None and memo[0] is pdf and memo[1] == length:
+                self._key_memo.move_to_end(id(pdf))
+                return memo[2]
+
+        key = hashlib.sha256(self._read_bytes(pdf)).hexdigest()
+        with self._key_memo_lock:
+            self._key_memo[id(pdf)] = (pdf, length, key)
+            while len(self._key_memo) > self.doc_cache.max_documents:
+                self._key_memo.popitem(last=False)
+        return key
+
+    def _input_length(self, pdf):
+        """
+        Returns the size in bytes of a PDF given as bytes or a seekable file-like object.
+        """
+        if isinstance(pdf, bytes):
+            return len(pdf)
+        if hasattr(pdf, 'seek') and hasattr(pdf, 'tell'):
+            pdf.seek(0, os.SEEK_END)
+            return pdf.tell()
+        raise ValueError("Invalid PDF input. Must be bytes or a file-like object.")
+
+    def _cached_opener(self, pdf):
+        if isinstance(pdf, (str, os.PathLike)):
+            return lambda: self.open_pdf(pdf)
+        return lambda: self.open_pdf(self._read_bytes(pdf))
+
+    def spool_to_file(self, pdf_file, chunk_size=1024 * 1024):
+        """
+        Copies an uploaded file object to a temporary file in fixed-size chunks.
+
+        The upload is never held in memory as a whole, and the content hash is computed
+        while spooling so no second read is needed. The caller owns the returned file
+        and must remove it.
+
+        Args:
+            pdf_file: A file-like object with a read(size) method.
+            chunk_size: Number of bytes copied per read.
+
+        Returns:
+            tuple: (path of the temporary PDF file, hex SHA-256 of its content)
+        """
+        if hasattr(pdf_file, 'seek'):
+            pdf_file.seek(0)
+        sha256 = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            while True:
+                chunk = pdf_file.read(chunk_size)
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                tmp.write(chunk)
+        return tmp.name, sha256.hexdigest()
+
+    def _read_bytes(self, pdf):
+        """
+        Returns the raw bytes of a PDF given as bytes or a file-like object.
+        """
+        if isinstance(pdf, bytes):
+            return pdf
+        if hasattr(pdf, 'read'):
+            pdf.seek(0)
+            return pdf.read()
+        raise ValueError("Invalid PDF input. Must be bytes or a file-like object.")
+
+    def _pages_from_doc(self, doc, as_blocks=False):
+        """
+        Extracts the content of every page of an opened document, keyed by 1-based page number.
+        """
+        all_text = {}
+        for page_number in range(doc.page_count):
+            all_text[str(page_number + 1)] = _page_content(doc[page_number], as_blocks)
+        return all_text
 
     def open_pdf(self, pdf):
         """
-        Opens a PDF file from a file-like object or bytes.
+        Opens a PDF file from a path, a file-like object or bytes.
+
+        A path is opened directly by PyMuPDF, which reads pages from disk on demand
+        instead of copying the whole file into memory.
 
         Args:
-            pdf: The PDF file to open. Can be bytes or a file-like object.
+            pdf: The PDF file to open. Can be a path, bytes or a file-like object.
 
         Returns:
             pdf_doc: The opened PDF document.
@@ -17,14 +287,18 @@ class PDFtoText:
         if not pdf:
             raise ValueError("PDF file is None or empty")
 
-        if isinstance(pdf, bytes):
+        import fitz  # PyMuPDF, imported on first use to keep application start-up fast
+
+        if isinstance(pdf, (str, os.PathLike)):
+            pdf_doc = fitz.open(pdf, filetype='pdf')
+        elif isinstance(pdf, bytes):
             pdf_doc = fitz.open(stream=pdf, filetype='pdf')
         elif hasattr(pdf, 'read'):
             pdf.seek(0)  # Reset file pointer to the beginning
             pdf_bytes = pdf.read()
             pdf_doc = fitz.open(stream=pdf_bytes, filetype='pdf')
         else:
-            raise ValueError("Invalid PDF input. Must be bytes or a file-like object.")
+            raise ValueError("Invalid PDF input. Must be a path, bytes or a file-like object.")
 
         return pdf_doc
 
@@ -64,60 +338,157 @@ class PDFtoText:
         if not pdf:
             return None
         with self.open_pdf(pdf) as doc:
+            all_text = self._pages_from_doc(doc)
+        return all_text
+
+    def extract_all_text_page_wise_parallel(self, pdf, workers=None):
+        """
+        Extracts text from the PDF page by page using the shared pool of worker processes.
+
+        The page range is split into one contiguous shard per worker. Every worker opens
+        the same file on disk (bytes are spooled once to a temporary file), and the shards
+        are merged back in page order. Small documents, or a single worker, fall back to
+        the serial path.
+
+        Args:
+            pdf: The PDF file to extract text from (path, bytes or file-like object).
+            workers: Overrides the number of worker processes for this call.
+
+        Returns:
+            all_text: A dictionary with page numbers as keys and page text as values.
+        """
+        if not pdf:
+            return None
+        return self._extract_pages(pdf, workers)
+
+    def _extract_pages(self, pdf, workers=None, as_blocks=False):
+        """
+        Extracts the content of every page, in parallel for large documents.
+        See `extract_all_text_page_wise_parallel`.
+        """
+        workers = workers or self.workers
+        is_path = isinstance(pdf, (str, os.PathLike))
+        if not is_path:
+            pdf = self._read_bytes(pdf)
+
+        with self.open_pdf(pdf) as doc:
+            page_count = doc.page_count
+            if workers <= 1 or page_count < self.parallel_min_pages:
+                return self._pages_from_doc(doc, as_blocks)
+
+        workers = min(workers, page_count)
+        shard_size = -(-page_count // workers)  # Ceiling division
+        shards = [(start, min(start + shard_size, page_count)) for start in range(0, page_count, shard_size)]
+
+        if is_path:
+            pdf_path = pdf
+        else:
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                tmp.write(pdf)
+                pdf_path = tmp.name
+
+        pool = get_extraction_pool()
+        try:
+            futures = [
+                pool.submit(_extract_page_shard, pdf_path, start, end, as_blocks)
+                for start, end in shards
+            ]
             all_text = {}
-            # Iterate through all pages
-            for page_number in range(doc.page_count):
-                # Get the page
-                page = doc[page_number]
-                # Extract text from the page
-                text = page.get_text()
-                all_text[str(page_number + 1)] = text
+            for future in futures:
+                all_text.update(future.result())
+        except BrokenProcessPool:
+            _discard_extraction_pool(pool)
+            raise
+        finally:
+            if not is_path:
+                os.remove(pdf_path)
+
         return all_text
 
-    def extract_text_from_single_page(self, pdf, page_number):
+    def extract_pages_and_text(self, pdf):
+        """
+        Extracts the page-wise text and the full text of the PDF in a single pass.
+
+        The document is parsed once (in parallel for large documents); the full text is
+        the page texts joined in page order, so it matches `extract_all_text` without a
+        second parse. When strip_boilerplate is enabled, running headers, footers and page
+        numbers are removed from every page before the text is returned.
+
+        Args:
+            pdf: The PDF file to extract text from (path, bytes or file-like object).
+
+        Returns:
+            tuple: (pages, all_text) where pages maps page numbers to page text
+                   and all_text is the extracted text as a single string.
+        """
+        if not pdf:
+            return None, None
+        if self.strip_boilerplate:
+            pages, stats = self.stripper.strip(self._extract_pages(pdf, as_blocks=True))
+            print(
+                f"Removed {stats['lines_removed']} boilerplate lines "
+                f"({stats['chars_removed']} characters, ~{stats['tokens_removed']} tokens) from {len(pages)} pages."
+            )
+        else:
+            pages = self._extract_pages(pdf)
+        all_text = "".join(pages.values())
+        return pages, all_text
+
+    def extract_text_from_single_page(self, pdf, page_number, content_hash=None):
         """
         Extracts text from a single page of the PDF.
 
+        The opened document and the page text are cached, so repeated lookups on the
+        same PDF do not reopen it.
+
         Args:
             pdf: The PDF file to extract text from.
             page_number: The page number to extract (1-based indexing).
+            content_hash: Optional precomputed content hash used as the cache key.
 
         Returns:
             text: The extracted text from the specified page.
         """
         if not pdf:
             return None
-        with self.open_pdf(pdf) as doc:
-            if page_number - 1 >= doc.page_count:
-                raise ValueError("Invalid page number")
-            else:
-                return doc[page_number - 1].get_text()
+        key = self._cache_key(pdf, content_hash)
+        opener = self._cached_opener(pdf)
+        if page_number - 1 >= self.doc_cache.page_count(key, opener):
+            raise ValueError("Invalid page number")
+        else:
+            return self.doc_cache.page_text(key, opener, page_number - 1)
 
-    def extract_text_from_interval(self, pdf, page_number, interval=1):
+    def extract_text_from_interval(self, pdf, page_number, interval=1, content_hash=None):
         """
         Extracts text from a range of pages around a specified page.
 
+        The opened document and the page texts are cached, so neighbouring page lookups
+        on the same PDF do not reopen it.
+
         Args:
             pdf: The PDF file to extract text from.
             page_number: The central page number (1-based indexing).
             interval: The number of pages before and after the central page to include.
+            content_hash: Optional precomputed content hash used as the cache key.
 
         Returns:
             text: The extracted text from the specified range of pages.
         """
         if not pdf:
             return None
-        with self.open_pdf(pdf) as doc:
-            text = ""
-            if page_number > doc.page_count:
-                raise ValueError("Invalid page number")
-            else:
-                # Calculate the start and end pages (0-based indexing)
-                start_page = max(0, page_number - interval - 1)
-                end_page = min(doc.page_count - 1, page_number + interval - 1)
+        key = self._cache_key(pdf, content_hash)
+        opener = self._cached_opener(pdf)
+        page_count = self.doc_cache.page_count(key, opener)
+        text = ""
+        if page_number > page_count:
+            raise ValueError("Invalid page number")
+        else:
+            # Calculate the start and end pages (0-based indexing)
+            start_page = max(0, page_number - interval - 1)
+            end_page = min(page_count - 1, page_number + interval - 1)
 
-                for page_num in range(start_page, end_page + 1):
-                    text += doc[page_num].get_text()
+            for page_num in range(start_page, end_page + 1):
+                text += self.doc_cache.page_text(key, opener, page_num)
         return text
 
 # Example usage:
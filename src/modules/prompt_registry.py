@@ -0,0 +1,175 @@
+import os
+import string
+import threading
+import time
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# The prompt files ship in src/constants; resolved from this file so the working directory does not matter.
+PROMPT_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "constants")
+
+# Placeholders each bundled prompt must contain, no more and no less.
+REQUIRED_PLACEHOLDERS: Dict[str, FrozenSet[str]] = {
+    "level_1_question_prompt": frozenset({"context", "topic", "n"}),
+    "level_1_topics": frozenset({"context"}),
+    "chat_prompt": frozenset({"context", "question"}),
+}
+
+
+class PromptTemplate:
+    """
+    A prompt template parsed once into literal segments and placeholder names.
+
+    Rendering joins the precomputed literals with the values instead of re-parsing the
+    whole template with str.format on every call. Only plain {name} placeholders are
+    allowed; {{ and }} are literal braces, as with str.format.
+    """
+
+    def __init__(self, name: str, text: str):
+        """
+        :param name: Name of the template, used in error messages.
+        :param text: The template text.
+        :raises ValueError: If the template is malformed or uses format specs, conversions or positional fields.
+        """
+        self.name = name
+        self.text = text
+        self._segments: List[Tuple[str, Optional[str]]] = []
+        try:
+            for literal, field, spec, conversion in string.Formatter().parse(text):
+                if field is not None and (not field.isidentifier() or spec or conversion):
+                    raise ValueError(f"only plain {{name}} placeholders are supported, found {{{field}}}")
+                self._segments.append((literal, field))
+        except ValueError as e:
+            raise ValueError(f"Invalid prompt template '{name}': {e}") from e
+        self.placeholders = frozenset(field for _, field in self._segments if field is not None)
+
+    def render(self, **values) -> str:
+        """
+        Returns the template with every placeholder replaced by str(value).
+
+        :raises KeyError: If a placeholder has no value.
+        """
+        missing = self.placeholders - values.keys()
+        if missing:
+            raise KeyError(f"Prompt '{self.name}' is missing values for: {', '.join(sorted(missing))}")
+        parts = []
+        for literal, field in self._segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(str(values[field]))
+        return "".join(parts)
+
+    # Lets existing prompt.format(...) call sites take a template
+    format = render
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class PromptRegistry:
+    """
+    Loads and validates the prompt templates once per process.
+
+    Templates are read from `<directory>/<name>.prompt` and checked against their
+    required placeholders at load time, so a broken prompt fails at startup instead of
+    on the first request. With hot_reload, a template whose file changed is re-read on
+    the next `get` (checked at most every check_interval seconds); a changed file that
+    fails validation is reported and the previous version kept.
+    """
+
+    _shared: Optional["PromptRegistry"] = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "PromptRegistry":
+        """
+        Returns the process-wide registry of the bundled prompts, loading it on first use.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __init__(
+        self,
+        directory: str = PROMPT_DIRECTORY,
+        required: Dict[str, FrozenSet[str]] = REQUIRED_PLACEHOLDERS,
+        hot_reload: bool = os.getenv("PROMPT_HOT_RELOAD", "false").lower() in ("1", "true", "yes"),
+        check_interval: float = 1.0,
+    ):
+        """
+        :param directory: Directory holding the .prompt files.
+        :param required: Required placeholders by template name; these templates are loaded eagerly.
+        :param hot_reload: Re-read templates whose files changed.
+        :param check_interval: Minimum number of seconds between two checks of one file.
+        :raises ValueError: If a required template is missing or invalid.
+        """
+        self.directory = directory
+        self.required = required
+        self.hot_reload = hot_reload
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._checked: Dict[str, float] = {}
+        for name in required:
+            self._load(name)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.prompt")
+
+    def _load(self, name: str) -> PromptTemplate:
+        path = self._path(name)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, "r", encoding="utf-8") as f:
+                template = PromptTemplate(name, f.read())
+        except OSError as e:
+            raise ValueError(f"Prompt template '{name}' could not be read from '{path}': {e}") from e
+
+        expected = self.required.get(name)
+        if expected is not None and template.placeholders != expected:
+            missing = expected - template.placeholders
+            unknown = template.placeholders - expected
+            problems = []
+            if missing:
+                problems.append(f"missing {', '.join('{' + field + '}' for field in sorted(missing))}")
+            if unknown:
+                problems.append(f"unknown {', '.join('{' + field + '}' for field in sorted(unknown))}")
+            raise ValueError(f"Prompt template '{name}' is invalid: {'; '.join(problems)}")
+
+        self._templates[name] = template
+        self._mtimes[name] = mtime
+        self._checked[name] = time.monotonic()
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        Returns the template called name, loading it on first use.
+
+        :raises ValueError: If the template is missing or invalid.
+        """
+        with self._lock:
+            template = self._templates.get(name)
+            if template is None:
+                return self._load(name)
+            if self.hot_reload and time.monotonic() - self._checked[name] >= self.check_interval:
+                self._checked[name] = time.monotonic()
+                try:
+                    mtime = os.path.getmtime(self._path(name))
+                except OSError:
+                    mtime = self._mtimes[name]
+                if mtime != self._mtimes[name]:
+                    try:
+                        template = self._load(name)
+                        print(f"Reloaded prompt template '{name}'.")
+                    except ValueError as e:
+                        # Report this version once, not on every call
+                        self._mtimes[name] = mtime
+                        print(f"Keeping the previous version of prompt template '{name}': {e}")
+            return template
+
+    def render(self, name: str, **values) -> str:
+        """
+        Renders the template called name with values.
+        """
+        return self.get(name).render(**values)
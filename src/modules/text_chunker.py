@@ -0,0 +1,106 @@
+import re
+from typing import Dict, List
+
+# Words and individual punctuation marks; a close, dependency-free approximation of
+# subword tokenizer counts for English prose.
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+class TextChunker:
+    """
+    Splits page text into overlapping, token-bounded chunks for the vector store.
+
+    Chunks are slices of the original page text, and each one records its page number
+    and character span so sources still resolve to a page and pages can be rebuilt
+    without the overlap.
+
+    Sizes are counted in TOKEN_PATTERN tokens, which undercount word pieces: rare words
+    split into several. The default of 200 keeps full-size chunks of English prose within
+    the 256 word pieces all-MiniLM-L6-v2 embeds, so their tails are not silently truncated.
+    """
+
+    def __init__(self, chunk_size: int = 200, chunk_overlap: int = 32):
+        """
+        :param chunk_size: Maximum number of tokens per chunk.
+        :param chunk_overlap: Number of tokens shared by consecutive chunks of a page.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be between 0 and chunk_size - 1")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        """
+        Returns the approximate number of tokens in text.
+        """
+        return len(TOKEN_PATTERN.findall(text))
+
+    def chunk_page(self, page_number, text: str) -> List[Dict]:
+        """
+        Splits the text of one page into chunks.
+
+        :param page_number: The page number the text belongs to.
+        :param text: The page text.
+        :return: A list of dictionaries with 'id', 'text' and 'metadata' (page_number,
+                 chunk_index, char_start, char_end).
+        """
+        spans = [match.span() for match in TOKEN_PATTERN.finditer(text)]
+        if not spans:
+            return []
+
+        chunks = []
+        step = self.chunk_size - self.chunk_overlap
+        for chunk_index, token_start in enumerate(range(0, len(spans), step)):
+            token_end = min(token_start + self.chunk_size, len(spans))
+            char_start = spans[token_start][0] if token_start else 0
+            char_end = spans[token_end][0] if token_end < len(spans) else len(text)
+            chunks.append({
+                "id": f"page_{page_number}_chunk_{chunk_index}",
+                "text": text[char_start:char_end],
+                "metadata": {
+                    "page_number": page_number,
+                    "chunk_index": chunk_index,
+                    "char_start": char_start,
+                    "char_end": char_end,
+                },
+            })
+            if token_end == len(spans):
+                break
+        return chunks
+
+    @staticmethod
+    def merge_chunks(documents: List[str], metadatas: List[Dict]) -> List[str]:
+        """
+        Rebuilds page texts from stored chunks, dropping the overlap between chunks.
+
+        Documents stored before chunking (one per page, without chunk metadata) are
+        returned as they are.
+
+        :param documents: Chunk texts as returned by the vector store.
+        :param metadatas: The matching chunk metadata.
+        :return: Page texts in page order.
+        """
+        def sort_key(item):
+            metadata = item[1] or {}
+            page_number = str(metadata.get("page_number", ""))
+            page_key = (0, int(page_number), "") if page_number.isdigit() else (1, 0, page_number)
+            return page_key, metadata.get("chunk_index", 0)
+
+        pages = {}
+        page_order = []
+        for document, metadata in sorted(zip(documents, metadatas), key=sort_key):
+            metadata = metadata or {}
+            page_number = metadata.get("page_number")
+            if page_number not in pages:
+                pages[page_number] = [document, metadata.get("char_end", len(document))]
+                page_order.append(page_number)
+                continue
+            page_text, covered_until = pages[page_number]
+            char_start = metadata.get("char_start", covered_until)
+            overlap = max(0, covered_until - char_start)
+            pages[page_number] = [page_text + document[overlap:], metadata.get("char_end", covered_until + len(document))]
+
+        return [pages[page_number][0] for page_number in page_order]
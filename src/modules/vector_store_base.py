@@ -0,0 +1,687 @@
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from .text_chunker import TextChunker
+from .lexical_index import LexicalIndex, RRF_K, reciprocal_rank_fusion
+from .context_packer import ContextPacker
+from .embedding_cache import EmbeddingCache, query_embedding_cache
+from .local_embedding_service import LocalEmbeddingService
+
+# 'vector' ranks by embedding similarity, 'lexical' by BM25 without any embedding call,
+# 'hybrid' fuses both rankings with reciprocal-rank fusion.
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+
+
+class BaseVectorStore(ABC):
+    """
+    The vector store interface used by the question generator, plus everything that does
+    not depend on the storage backend: embeddings (Gemini or local), the embedding caches,
+    chunking, batched, resumable ingestion and the per-collection BM25 index used by the
+    'lexical' and 'hybrid' retrieval modes.
+
+    Backends implement the abstract storage methods below; a backend missing one cannot
+    be instantiated.
+    """
+
+    vector_store = "Base"
+
+    def __init__(
+        self,
+        openai_api_key: Optional[str] = os.getenv("GEMINI_API_KEY"),
+        persist_directory: str = "./data/vector_store",
+        model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        chunk_size: int = 200,
+        chunk_overlap: int = 32,
+        embedding_batch_size: int = 64,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        use_embedding_cache: bool = True,
+    ):
+        """
+        :param openai_api_key: Your Gemini API key. Without one, the local Hugging Face model is used.
+        :param persist_directory: Directory where the backend persists its data.
+        :param model: The Hugging Face embedding model to use without an API key.
+        :param chunk_size: Maximum number of tokens per stored chunk.
+        :param chunk_overlap: Number of tokens shared by consecutive chunks of a page.
+        :param embedding_batch_size: Number of texts encoded per forward pass of the local model.
+        :param embedding_cache: Embedding cache to use. Defaults to the shared cache stored next to persist_directory.
+        :param use_embedding_cache: Set to False to always compute document embeddings.
+        """
+        if openai_api_key:
+            from chromadb.utils.embedding_functions.google_embedding_function import GoogleGenerativeAiEmbeddingFunction
+
+            self.openai_api_key = openai_api_key
+            self.model = "models/text-embedding-004"
+            self.embedding_model  = GoogleGenerativeAiEmbeddingFunction(api_key=self.openai_api_key,model_name= self.openai_api_key)
+            self.google_ef  = GoogleGenerativeAiEmbeddingFunction(api_key=self.openai_api_key,model_name= self.model, task_type="RETRIEVAL_DOCUMENT")
+            self.google_ef_r  = GoogleGenerativeAiEmbeddingFunction(api_key=self.openai_api_key,model_name= self.model, task_type="RETRIEVAL_QUERY")
+
+        else:
+            self.openai_api_key = None
+            self.model = model
+            try:
+                # One model copy per process, shared and micro-batched across stores and threads
+                self.embedding_model = LocalEmbeddingService.shared(model)
+            except Exception as e:
+                print(f"Error loading embedding model '{model}': {e}")
+
+        self.embeddings_model_name = self.model
+        self.persist_directory = persist_directory
+        self.chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.embedding_batch_size = embedding_batch_size
+        if use_embedding_cache:
+            self.embedding_cache = embedding_cache or EmbeddingCache.shared(
+                os.path.join(os.path.dirname(os.path.abspath(persist_directory)), "embedding_cache")
+            )
+        else:
+            self.embedding_cache = None
+        self.query_cache = query_embedding_cache
+        self._lexical_indexes: Dict[str, LexicalIndex] = {}
+        self._lexical_lock = threading.Lock()
+        self.method = "RAG Pipeline"
+
+    # Storage backend interface
+
+    @abstractmethod
+    def collection_exists(self, collection_name: str) -> bool:
+        """
+        Checks whether a collection exists without creating it.
+        """
+
+    @abstractmethod
+    def get_all_text(self, collection_name: str) -> List[str]:
+        """
+        Returns the page texts of a collection in page order.
+
+        :raises ValueError: If the collection does not exist.
+        """
+
+    @abstractmethod
+    def get_ingest_progress(self, collection_name: str) -> Dict[str, Any]:
+        """
+        Returns a dictionary with 'pages_committed' and 'pages_total' (zero if unknown) and
+        the 'content_hash' of the ingested document (None if unknown).
+        """
+
+    @abstractmethod
+    def reset_client(self):
+        """
+        Deletes every collection of the store.
+        """
+
+    @abstractmethod
+    def delete_collection(self, collection_name: str) -> None:
+        """
+        Deletes one collection with its lexical index, leaving the others untouched.
+
+        :raises ValueError: If the collection does not exist.
+        """
+
+    @abstractmethod
+    def compact(self) -> Dict[str, int]:
+        """
+        Reclaims disk space left behind by deleted collections and interrupted writes.
+
+        :return: A dictionary with 'bytes_before' and 'bytes_after'.
+        """
+
+    def forget_collection(self, collection_name: str) -> None:
+        """
+        Drops every in-memory handle of a collection, e.g. after another store instance
+        sharing the same directory deleted it. Other collections stay loaded.
+        """
+        with self._lexical_lock:
+            self._lexical_indexes.pop(collection_name, None)
+
+    def disk_usage(self) -> int:
+        """
+        Returns the number of bytes stored under persist_directory.
+        """
+        return sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(self.persist_directory)
+            for name in names
+        )
+
+    @abstractmethod
+    def _prepare_collection(self, collection_name: str, content_hash: Optional[str] = None) -> None:
+        """
+        Creates the collection if it does not exist yet, recording content_hash (if given)
+        in its metadata next to the ingest progress.
+        """
+
+    @abstractmethod
+    def _existing_ids(self, collection_name: str, ids: List[str]) -> List[str]:
+        """
+        Returns which of ids are already stored in the collection.
+        """
+
+    @abstractmethod
+    def _add(self, collection_name: str, ids: List[str], texts: List[str], embeddings: List[List[float]], metadatas: List[dict]) -> None:
+        """
+        Adds documents with their embeddings and metadata to the collection.
+        """
+
+    @abstractmethod
+    def _update_ingest_progress(self, collection_name: str, pages_committed: int, pages_total: int) -> None:
+        """
+        Records how many pages of the collection are committed.
+        """
+
+    @abstractmethod
+    def _query(self, collection_name: str, query_embeddings: List[List[float]], top_k: int) -> Dict[str, list]:
+        """
+        Returns the top_k nearest documents per query embedding as a dictionary of
+        'ids', 'documents', 'metadatas' and 'distances', each holding one list per query.
+        """
+
+    @abstractmethod
+    def _all_records(self, collection_name: str) -> Tuple[List[str], List[str]]:
+        """
+        Returns the ids and documents of every chunk in the collection.
+        """
+
+    @abstractmethod
+    def _get_records(self, collection_name: str, ids: List[str]) -> Tuple[List[str], List[dict]]:
+        """
+        Returns the documents and metadatas of the given ids, in the same order.
+        """
+
+    @abstractmethod
+    def _get_embeddings(self, collection_name: str, ids: List[str]):
+        """
+        Returns the stored embeddings of the given ids as a float32 (len(ids), dim) matrix, in the same order.
+        """
+
+    @abstractmethod
+    def _export_records(self, collection_name: str) -> Tuple[List[str], List[str], List[dict], Any]:
+        """
+        Returns the ids, documents, metadatas and a float32 (count, dim) embedding matrix
+        of every chunk in the collection.
+        """
+
+    # Export and import, used to archive cold collections
+
+    def export_collection(self, collection_name: str) -> Dict[str, Any]:
+        """
+        Returns everything needed to recreate a collection with `import_collection`.
+
+        :param collection_name: The name of the collection.
+        :return: A dictionary with 'ids', 'documents', 'metadatas', 'embeddings' and 'progress'.
+        :raises ValueError: If the collection does not exist.
+        """
+        if not self.collection_exists(collection_name):
+            raise ValueError(f"Collection '{collection_name}' does not exist.")
+        ids, documents, metadatas, embeddings = self._export_records(collection_name)
+        return {
+            "ids": ids,
+            "documents": documents,
+            "metadatas": metadatas,
+            "embeddings": embeddings,
+            "progress": self.get_ingest_progress(collection_name),
+        }
+
+    def import_collection(self, collection_name: str, data: Dict[str, Any], batch_size: int = 1024) -> None:
+        """
+        Recreates a collection from `export_collection` output without embedding anything.
+
+        :param collection_name: The name of the collection to create.
+        :param data: The exported collection.
+        :param batch_size: Number of chunks added per batch.
+        """
+        self._prepare_collection(collection_name, data["progress"].get("content_hash"))
+        lexical_index = self.get_lexical_index(collection_name)
+        ids, documents, metadatas = data["ids"], data["documents"], data["metadatas"]
+        for batch_start in range(0, len(ids), batch_size):
+            batch = slice(batch_start, batch_start + batch_size)
+            self._add(
+                collection_name, ids[batch], documents[batch],
+                [list(map(float, vector)) for vector in data["embeddings"][batch]], metadatas[batch],
+            )
+            lexical_index.add(ids[batch], documents[batch])
+        lexical_index.save()
+        progress = data["progress"]
+        self._update_ingest_progress(collection_name, progress["pages_committed"], progress["pages_total"])
+
+    # Lexical index
+
+    def _lexical_index_path(self, collection_name: str) -> str:
+        return os.path.join(self.persist_directory, "lexical_index", f"{collection_name}.json")
+
+    def get_lexical_index(self, collection_name: str) -> LexicalIndex:
+        """
+        Returns the BM25 index of a collection, building it from the stored chunks if the
+        collection predates lexical indexing.
+
+        :param collection_name: The name of the collection.
+        :return: The collection's lexical index.
+        """
+        with self._lexical_lock:
+            index = self._lexical_indexes.get(collection_name)
+            if index is None:
+                path = self._lexical_index_path(collection_name)
+                index = LexicalIndex(path)
+                if not os.path.exists(path) and self.collection_exists(collection_name):
+                    ids, documents = self._all_records(collection_name)
+                    if ids:
+                        print(f"Building lexical index of '{collection_name}' from {len(ids)} stored chunks.")
+                        index.add(ids, documents)
+                        index.save()
+                self._lexical_indexes[collection_name] = index
+            return index
+
+    def _delete_lexical_index(self, collection_name: str) -> None:
+        with self._lexical_lock:
+            self._lexical_indexes.pop(collection_name, None)
+            path = self._lexical_index_path(collection_name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _reset_lexical_indexes(self) -> None:
+        with self._lexical_lock:
+            self._lexical_indexes = {}
+            shutil.rmtree(os.path.join(self.persist_directory, "lexical_index"), ignore_errors=True)
+
+    # Backend-independent behaviour
+
+    def get_all_text_str(self, collection_name):
+        docs = self.get_all_text(collection_name)
+
+        return " ".join(docs)
+
+    def get_embedding(self, text: str) -> List[float]:
+        """
+        Generates an embedding for the given text using the Hugging Face model.
+
+        :param text: The text to embed.
+        :return: A list of floats representing the embedding.
+        """
+        try:
+            if self.openai_api_key:
+                import google.generativeai as genai
+
+                embedding = genai.embed_content(model =self.model, content = text, task_type="retrieval_query").get("embedding")
+            else:
+                embedding = self.embedding_model.encode(text, convert_to_numpy=True).tolist()
+            return embedding
+        except Exception as e:
+            print(f"Error generating embedding with Hugging Face model: {e}")
+
+    def _embed_with_gemini(self, texts: List[str], task_type: str) -> List[List[float]]:
+        """
+        Embeds texts with a single embed_content call, which the SDK sends as batch requests
+        of up to 100 texts. Chroma's embedding functions make one request per text instead.
+
+        :param texts: The texts to embed.
+        :param task_type: 'retrieval_query' or 'retrieval_document'.
+        :return: One embedding per text.
+        """
+        import google.generativeai as genai
+
+        response = genai.embed_content(model=self.model, content=list(texts), task_type=task_type)
+        return [[float(value) for value in vector] for vector in response["embedding"]]
+
+    def get_query_embedding(self, query: str) -> List[float]:
+        """
+        Embeds a retrieval query through the shared query-embedding LRU cache.
+
+        :param query: The query text (a chat question or a topic).
+        :return: The query embedding.
+        """
+        if self.openai_api_key:
+            compute = lambda text: self._embed_with_gemini([text], "retrieval_query")[0]
+        else:
+            compute = self.get_embedding
+        return self.query_cache.get_or_compute(self.model, query, compute)
+
+    def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embeds several retrieval queries, computing all cache misses in one embedding call
+        (one batch request with Gemini, one forward pass locally).
+
+        :param queries: The query texts.
+        :return: One embedding per query.
+        """
+        if self.openai_api_key:
+            compute_many = lambda texts: self._embed_with_gemini(texts, "retrieval_query")
+        else:
+            compute_many = lambda texts: self.embedding_model.encode(texts, convert_to_numpy=True).tolist()
+        return self.query_cache.get_or_compute_many(self.model, queries, compute_many)
+
+    def get_document_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds many document texts, reusing cached embeddings where possible.
+
+        The embedding cache is consulted first, keyed by model, task type and text hash, and
+        only the misses are computed: with Gemini in batch requests, locally in length-sorted
+        batches.
+
+        :param texts: The texts to embed.
+        :return: One embedding per text.
+        """
+        task_type = "RETRIEVAL_DOCUMENT" if self.openai_api_key else ""
+        if self.embedding_cache:
+            embeddings = self.embedding_cache.get_many(self.model, task_type, texts)
+        else:
+            embeddings = [None] * len(texts)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            vectors = self._embed_documents(missing_texts)
+            for i, vector in zip(missing, vectors):
+                embeddings[i] = vector
+            if self.embedding_cache:
+                self.embedding_cache.put_many(self.model, task_type, missing_texts, vectors)
+        return embeddings
+
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Computes document embeddings without the cache.
+
+        Local texts are encoded in order of length so each batch pads to similar lengths,
+        and the vectors are returned in the original order.
+        """
+        if self.openai_api_key:
+            return self._embed_with_gemini(texts, "retrieval_document")
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = self.embedding_model.encode(
+            [texts[i] for i in order],
+            batch_size=self.embedding_batch_size,
+            convert_to_numpy=True,
+        )
+        embeddings = [None] * len(texts)
+        for position, i in enumerate(order):
+            embeddings[i] = vectors[position].tolist()
+        return embeddings
+
+    def store_texts(
+        self,
+        pages: Dict[int, str],
+        collection_name: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        batch_size: int = 128,
+        content_hash: Optional[str] = None,
+    ) -> None:
+        """
+        Stores text data from pages into the specified collection with embeddings and metadata.
+
+        Each page is split into token-bounded, overlapping chunks that keep the page number
+        in their metadata. Chunks are embedded and committed in batches of batch_size, and
+        the collection's progress marker is updated after every batch. Chunks already in the
+        collection are skipped, so retrying after a failure only embeds and adds what is missing.
+        With content_hash, the collection records which document it holds, and only a retry
+        of that same document resumes into it.
+
+        :param pages: A dictionary with page numbers as keys and text content as values.
+        :param collection_name: The name of the collection where documents will be stored.
+        :param progress_callback: Optional callable receiving (pages_processed, total_pages).
+        :param batch_size: Number of chunks embedded and committed per batch.
+        :param content_hash: SHA-256 of the source document, stored in the collection metadata.
+        :raises ValueError: If content_hash is given and the existing collection holds another document.
+        :raises RuntimeError: If a batch cannot be added; earlier batches stay committed.
+        """
+        total_pages = len(pages)
+        if content_hash and self.collection_exists(collection_name):
+            stored_hash = self.get_ingest_progress(collection_name).get("content_hash")
+            if stored_hash != content_hash:
+                raise ValueError(
+                    f"Collection '{collection_name}' holds a different document; not resuming ingestion into it."
+                )
+        self._prepare_collection(collection_name, content_hash)
+
+        # Split every page into token-bounded chunks that keep their page number
+        chunks = []
+        for page_num, text in pages.items():
+            page_chunks = self.chunker.chunk_page(page_num, text)
+            if not page_chunks:
+                print(f"Warning: Page {page_num} is empty. Skipping.")
+                continue
+            page_chunks[-1]["last_of_page"] = True
+            chunks.extend(page_chunks)
+
+        # Fetch existing IDs to avoid duplicates and resume interrupted ingestions
+        try:
+            existing_ids = set(self._existing_ids(collection_name, [chunk["id"] for chunk in chunks]))
+        except Exception as e:
+            print(f"Error fetching existing document IDs: {e}")
+            existing_ids = set()
+
+        if existing_ids:
+            print(f"Resuming ingestion of '{collection_name}': {len(existing_ids)} of {len(chunks)} chunks already stored.")
+
+        # Chunks committed by an interrupted run may have missed the lexical index
+        lexical_index = self.get_lexical_index(collection_name)
+        unindexed = [chunk for chunk in chunks if chunk["id"] in existing_ids and chunk["id"] not in lexical_index]
+        if unindexed:
+            lexical_index.add([chunk["id"] for chunk in unindexed], [chunk["text"] for chunk in unindexed])
+            lexical_index.save()
+
+        # Already committed by an earlier run
+        pending = [chunk for chunk in chunks if chunk["id"] not in existing_ids]
+
+        pages_processed = total_pages - sum(1 for chunk in pending if chunk.get("last_of_page"))
+        if progress_callback:
+            progress_callback(pages_processed, total_pages)
+
+        added = 0
+        for batch_start in range(0, len(pending), batch_size):
+            batch = pending[batch_start:batch_start + batch_size]
+
+            texts = [chunk["text"] for chunk in batch]
+            metadatas = [chunk["metadata"] for chunk in batch]
+            ids = [chunk["id"] for chunk in batch]
+
+            try:
+                embeddings = self.get_document_embeddings(texts)
+            except Exception as e:
+                print(f"Failed to generate embeddings for collection '{collection_name}': {e}")
+                raise RuntimeError(
+                    f"Ingestion of '{collection_name}' stopped after {pages_processed} of {total_pages} pages; retry to resume."
+                ) from e
+
+            try:
+                self._add(collection_name, ids, texts, embeddings, metadatas)
+            except Exception as e:
+                print(f"Error adding documents to collection '{collection_name}': {e}")
+                raise RuntimeError(
+                    f"Ingestion of '{collection_name}' stopped after {pages_processed} of {total_pages} pages; retry to resume."
+                ) from e
+            added += len(texts)
+            lexical_index.add(ids, texts)
+            lexical_index.save()
+
+            pages_processed += sum(1 for chunk in batch if chunk.get("last_of_page"))
+            self._update_ingest_progress(collection_name, pages_processed, total_pages)
+            if progress_callback:
+                progress_callback(pages_processed, total_pages)
+
+        if added:
+            print(f"Successfully added {added} documents to collection '{collection_name}'.")
+        else:
+            print(f"No valid texts to add to collection '{collection_name}'.")
+
+    def fetch_relevant_documents(
+        self, topic: str, collection_name: str, top_k: int = 5, mode: str = "vector"
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetches top_k relevant documents from the specified collection based on the topic.
+
+        :param topic: The topic to search for.
+        :param collection_name: The name of the collection to query.
+        :param top_k: The number of top documents to retrieve.
+        :param mode: 'vector', 'lexical' (BM25, no embedding call) or 'hybrid' (reciprocal-rank fusion of both).
+        :return: A tuple containing the raw results and a list of dictionaries with the document, metadata, and confidence score.
+        :raises ValueError: If the collection does not exist or the mode is unknown.
+        """
+        results = self._search(
+            [topic], collection_name, top_k, mode,
+            embed=lambda topics: [self.get_query_embedding(topics[0])],
+        )
+
+        # Access the first (and only) query's results
+        fetched_docs = self._format_results(
+            results["documents"][0], results["metadatas"][0], results["distances"][0]
+        )
+
+        return results, fetched_docs
+
+    def fetch_relevant_documents_batch(
+        self, topics: List[str], collection_name: str, top_k: int = 5, mode: str = "vector"
+    ) -> List[tuple]:
+        """
+        Fetches top_k relevant documents for several topics with one embedding call and one query.
+
+        :param topics: The topics to search for.
+        :param collection_name: The name of the collection to query.
+        :param top_k: The number of top documents to retrieve per topic.
+        :param mode: 'vector', 'lexical' (BM25, no embedding call) or 'hybrid' (reciprocal-rank fusion of both).
+        :return: One (raw results, fetched documents) tuple per topic, as returned by `fetch_relevant_documents`.
+        :raises ValueError: If the collection does not exist or the mode is unknown.
+        """
+        if not topics:
+            return []
+        results = self._search(topics, collection_name, top_k, mode, embed=self.get_query_embeddings)
+
+        per_topic = []
+        for i in range(len(topics)):
+            topic_results = {
+                key: [results[key][i]] for key in ("ids", "documents", "metadatas", "distances")
+            }
+            fetched_docs = self._format_results(
+                results["documents"][i], results["metadatas"][i], results["distances"][i]
+            )
+            per_topic.append((topic_results, fetched_docs))
+        return per_topic
+
+    def fetch_packed_documents(
+        self, topic: str, collection_name: str, packer: ContextPacker, top_k: int = 5, mode: str = "vector"
+    ) -> tuple:
+        """
+        Fetches up to top_k documents for the topic, chosen among more candidates by
+        maximal marginal relevance and limited to the packer's token budget.
+
+        :param topic: The topic to search for.
+        :param collection_name: The name of the collection to query.
+        :param packer: The context packer selecting the documents.
+        :param top_k: The maximum number of documents to return.
+        :param mode: 'vector', 'lexical' or 'hybrid', as in `fetch_relevant_documents`.
+        :return: A tuple of the raw candidate results and the packed documents.
+        :raises ValueError: If the collection does not exist or the mode is unknown.
+        """
+        return self.fetch_packed_documents_batch([topic], collection_name, packer, top_k, mode)[0]
+
+    def fetch_packed_documents_batch(
+        self, topics: List[str], collection_name: str, packer: ContextPacker, top_k: int = 5, mode: str = "vector"
+    ) -> List[tuple]:
+        """
+        Runs `fetch_packed_documents` for several topics with one retrieval.
+
+        Relevance is the cosine similarity between the (cached) query embedding and the
+        stored chunk embeddings; in lexical mode, which makes no embedding call, the
+        retrieval confidence is used instead.
+
+        :return: One (raw candidate results, packed documents) tuple per topic.
+        """
+        per_topic = self.fetch_relevant_documents_batch(
+            topics, collection_name, top_k=top_k * packer.candidate_factor, mode=mode
+        )
+        if not per_topic:
+            return []
+        import numpy as np
+
+        query_embeddings = None
+        if mode != "lexical":
+            query_embeddings = np.asarray(self.get_query_embeddings(topics), dtype=np.float32)
+            query_embeddings /= np.maximum(np.linalg.norm(query_embeddings, axis=1, keepdims=True), 1e-12)
+
+        packed = []
+        for i, (results, fetched_docs) in enumerate(per_topic):
+            ids = results["ids"][0]
+            if len(ids) <= 1:
+                packed.append((results, fetched_docs[:top_k]))
+                continue
+            try:
+                embeddings = self._get_embeddings(collection_name, ids)
+            except Exception as e:
+                print(f"Error fetching embeddings from the {self.vector_store} collection '{collection_name}': {e}")
+                packed.append((results, fetched_docs[:top_k]))
+                continue
+            if query_embeddings is not None:
+                norms = np.maximum(np.linalg.norm(embeddings, axis=1), 1e-12)
+                relevance = embeddings @ query_embeddings[i] / norms
+            else:
+                relevance = [doc["confidence"] for doc in fetched_docs]
+            packed.append((results, packer.pack(fetched_docs, embeddings, relevance, max_documents=top_k)))
+        return packed
+
+    def _search(
+        self,
+        topics: List[str],
+        collection_name: str,
+        top_k: int,
+        mode: str,
+        embed: Callable[[List[str]], List[List[float]]],
+    ) -> Dict[str, list]:
+        """
+        Runs the retrieval for every topic and returns the results in the shape of `_query`.
+
+        Lexical distances are 1 - score / best score of the topic; hybrid distances are
+        1 - fused score / the fused score of a document ranked first by both retrievers.
+        Query errors are logged and yield empty results, as before.
+        """
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}'. Use one of {', '.join(RETRIEVAL_MODES)}.")
+        if not self.collection_exists(collection_name):
+            raise ValueError(f"Collection '{collection_name}' does not exist.")
+        results = {key: [[] for _ in topics] for key in ("ids", "documents", "metadatas", "distances")}
+
+        try:
+            if mode == "vector":
+                return self._query(collection_name, embed(topics), top_k)
+
+            # Fusion needs a deeper candidate list from each retriever than it returns
+            candidates = top_k if mode == "lexical" else max(top_k * 4, 20)
+            lexical_index = self.get_lexical_index(collection_name)
+            lexical_hits = [lexical_index.search(topic, candidates) for topic in topics]
+
+            ranked = []
+            if mode == "lexical":
+                for hits in lexical_hits:
+                    best = hits[0][1] if hits else 1.0
+                    ranked.append([(id_, 1.0 - score / best) for id_, score in hits])
+            else:
+                vector_results = self._query(collection_name, embed(topics), candidates)
+                best = 2.0 / (RRF_K + 1)
+                for hits, vector_ids in zip(lexical_hits, vector_results["ids"]):
+                    fused = reciprocal_rank_fusion([vector_ids, [id_ for id_, _ in hits]])[:top_k]
+                    ranked.append([(id_, 1.0 - score / best) for id_, score in fused])
+
+            # One lookup for the documents of every topic
+            all_ids = list(dict.fromkeys(id_ for topic_ranked in ranked for id_, _ in topic_ranked))
+            documents, metadatas = self._get_records(collection_name, all_ids)
+            records = dict(zip(all_ids, zip(documents, metadatas)))
+            for i, topic_ranked in enumerate(ranked):
+                results["ids"][i] = [id_ for id_, _ in topic_ranked]
+                results["documents"][i] = [records[id_][0] for id_, _ in topic_ranked]
+                results["metadatas"][i] = [records[id_][1] for id_, _ in topic_ranked]
+                results["distances"][i] = [distance for _, distance in topic_ranked]
+        except Exception as e:
+            print(f"Error querying the {self.vector_store} collection '{collection_name}': {e}")
+
+        return results
+
+    def _format_results(self, documents, metadatas, distances) -> List[Dict[str, Any]]:
+        fetched_docs = []
+        for doc, metadata, distance in zip(documents, metadatas, distances):
+            confidence = max(0.0, 1.0 - distance)  # Simple normalization
+            fetched_docs.append(
+                {
+                    "document": doc,
+                    "metadata": metadata,
+                    "confidence": round(confidence, 4),
+                }
+            )
+        return fetched_docs